@@ -5,22 +5,38 @@ archiver le weekend passé
 Scrapy
 python scra.py
 open EventsViewer.html
-select best manifs
+select best manifs (or: python tools/routeplan.py OUTPUT_DIR/vg_manifs.json --date ...)
 Paste to route planner, generate routes
 generate pdfs
-clean pdfs (remove duplicates)
+clean pdfs (remove duplicates: tools/router.py DEDUPE does it for the gallery)
 merge pdfs
 put in ondrive
 calculate route
 """
 
 import re
+import sys
 import json
+import asyncio
 from datetime import datetime, timedelta
 import os, html
-from collections import defaultdict
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from browserpool import fetch_pages
+from eventfetch import MODE_TIERED
+from manifest import ScrapeManifest, listing_card
+from discovery import shard_listing_url, find_next_page
+from eventcrawl import crawl_listings
+from pagescan import PageScan, title_from, exposants_in, date_from_time, ville_from_address
+from htmlparse import make_soup
+from eventstore import EventStore
+from manif import Manif, group_by_day
+from frdates import FALLBACK_DATE, FR_DATE_RE, parse_date, format_date_fr, fr_date_in
+from eventstream import EventStream, run_key
+from contextlib import nullcontext
+from geocode import geocode_manifs
+from spatial import HOME, set_home_distance
 
 
 # -------------------------------------
@@ -47,97 +63,44 @@ min_date = f"{year}-11-10"
 max_date = f"{year}-12-31"
 MASTER_URL = f"https://vide-greniers.org/evenements/Ile-de-France?min={min_date}&max={max_date}&tags%5B0%5D=1"
 #MASTER_URL = f"https://vide-greniers.org/evenements/Paris-75?distance=50&min=2025-11-10&max=2025-12-31&tags%5B0%5D=1"
+# MASTER_URL is split into weekly windows x départements, every shard paginated
+DEPARTEMENTS = ["Paris-75", "Seine-et-Marne-77", "Yvelines-78", "Essonne-91",
+                "Hauts-de-Seine-92", "Seine-Saint-Denis-93", "Val-de-Marne-94", "Val-d-Oise-95"]
 OUTPUT_DIR = r"C:\Users\hdoghmen\OneDrive\VNTD_LBC_25\0.Warehouse\1.Route"  # change to desired folder
-OUTPUT_PREFIX = "vg_manifs__"
+JSON_OUTPUT = "vg_manifs.json"  # view of the events listed by the last run (history lives in the event store)
+STREAM_OUTPUT = "vg_manifs.ndjson"  # in OUTPUT_DIR: one line per event as soon as it is scraped (tools/eventstream.py follow) | "" : off
+RESUME = True  # a run interrupted on the same window restarts from the events already in STREAM_OUTPUT
+GEOCODE = True  # lat/lon added to the events (tools/geocode.py, persistent cache) instead of geocoding in the viewers
+EVENT_SOURCE = "vide-greniers"  # key of these events in the event store (tools/eventstore.py)
 HTML_OUTPUT = "vg.html"
+CONCURRENCY = 6  # event pages loaded at the same time by the browser pool
+FETCH_MODE = MODE_TIERED  # "tiered": HTTP first, browser only for incomplete pages | "browser": always Playwright
+EXTRACTOR = "legacy"  # "legacy": field by field | "scan": single PageScan pass, once tools/check_extract.py agrees on real pages
+# the browser returns a page as soon as the elements read by the extractors are filled in
+EVENT_READY_SELECTORS = ("h1", "time", "section[x-ref='locationSection']")
+MASTER_READY_SELECTORS = ("a[href*='/evenement/']",)
+MANIFEST_FILE = "vg_manifest.json"  # in OUTPUT_DIR: events already scraped by previous runs
+MANIFEST_REFRESH_HOURS = 72         # unchanged events are re-extracted after this
 #=================================================================
 
-FALLBACK_DATE = "01.01.0001"
-# French weekday and month names for formatting
-WEEKDAY_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
-MONTH_FR = {
-    1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril", 5: "Mai", 6: "Juin",
-    7: "Juillet", 8: "Août", 9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre"
-}
-
 # -----------------------
-# Helpers: date parsing & formatting
+# Helpers: date parsing & formatting -> tools/frdates.py (parse_date, format_date_fr, fr_date_in)
+# field helpers shared with skyscra.py -> tools/pagescan.py (title_from, exposants_in, date_from_time...)
 # ------------------------
-def format_date_fr(dt: datetime) -> str:
-    if not isinstance(dt, datetime):
-        return FALLBACK_DATE
-    weekday = WEEKDAY_FR[dt.weekday()]
-    month = MONTH_FR[dt.month]
-    return f"{weekday} {dt.day} {month} {dt.year}" #Return date in 'Dimanche 5 Octobre 2025' format
-
-def parse_iso_date_str(s: str):
-    if not s:
-        return None
-    # Attempt to find YYYY-MM-DD
-    m = re.search(r"(\d{4})-(\d{2})-(\d{2})", s)
-    if m:
-        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        try:
-            return datetime(y, mo, d)
-        except:
-            return None    
-    m2 = re.search(r"(\d{4})/(\d{2})/(\d{2})", s) # Try basic YYYY/MM/DD
-    if m2:
-        y, mo, d = int(m2.group(1)), int(m2.group(2)), int(m2.group(3))
-        try:
-            return datetime(y, mo, d)
-        except:
-            return None
-    return None
-
-def parse_fr_date_string(s: str):
-    if not s or s == FALLBACK_DATE:
-        return None
-    pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+(\d{1,2})\s+([A-Za-zÀ-ÿ]+)\s+(\d{4})"
-    m = re.search(pattern, s, flags=re.IGNORECASE)
-    if not m:
-        return None
-    day = int(m.group(2))
-    month_name = m.group(3).capitalize()
-    year = int(m.group(4))
-    # map month_name to number
-    month_num = None
-    for num, name in MONTH_FR.items():
-        if name.lower() == month_name.lower():
-            month_num = num
-            break
-    if not month_num:
-        return None
-    try:
-        return datetime(year, month_num, day)
-    except:
-        return None
 
 # ----------------------------
 # Technique A: time tag
 # ----------------------------
 def date_from_time_tag(soup):
-    time_tag = soup.find("time")
-    if not time_tag:
-        return FALLBACK_DATE
-    text = time_tag.get_text(" ", strip=True)
-    # If text contains a French date, return the matched part
-    fr_pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}"
-    m = re.search(fr_pattern, text, flags=re.IGNORECASE)
-    if m:
-        return m.group(0).strip()
-    # try datetime attribute or text iso
-    dt_attr = time_tag.get("datetime") or text
-    dt = parse_iso_date_str(dt_attr)
-    if dt:
-        return format_date_fr(dt)
-    return FALLBACK_DATE
+    return date_from_time(soup.find("time"))
 
 # ----------------------------
 # Technique B: JSON-LD or page-wide regex
 # ----------------------------
 def extract_startdate_from_jsonld(soup):
-    scripts = soup.find_all("script", type="application/ld+json")
+    return _startdate_from_scripts(soup.find_all("script", type="application/ld+json"))
+
+def _startdate_from_scripts(scripts):
     for s in scripts:
         try:
             text = s.string
@@ -169,24 +132,18 @@ def extract_startdate_from_jsonld(soup):
             return None
 
         sd = find_startdate(data)
-        if sd:
-            dt = parse_iso_date_str(sd)
-            if dt:
-                return format_date_fr(dt)
-            # sometimes startDate may already be human readable
-            if isinstance(sd, str):
-                m = re.search(r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}", sd, flags=re.IGNORECASE)
-                if m:
-                    return m.group(0).strip()
+        if isinstance(sd, str):
+            # sometimes startDate is already human readable: keep it as written
+            m = FR_DATE_RE.search(sd)
+            if m:
+                return m.group(0).strip()
+            d = parse_date(sd)
+            if d:
+                return format_date_fr(d)
     return FALLBACK_DATE
 
 def extract_date_via_regex_whole_page(soup):
-    text = soup.get_text(" ", strip=True)
-    pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}"
-    m = re.search(pattern, text, flags=re.IGNORECASE)
-    if m:
-        return m.group(0).strip()
-    return FALLBACK_DATE
+    return fr_date_in(soup.get_text(" ", strip=True))
 
 # ----------------------------
 # Master extract_date using two techniques
@@ -213,25 +170,10 @@ def extract_date(soup):
 # Other extractors (title, exposants, address)
 # ----------------------------
 def extract_title(soup):  
-    title = None
-    h1 = soup.find("h1")
-    if h1 and h1.get_text(strip=True):
-        title = h1.get_text(" ", strip=True)
-    if not title:
-        h2 = soup.find("h2")
-        if h2 and h2.get_text(strip=True):
-            title = h2.get_text(" ", strip=True)
-    return title or "NA"
+    return title_from(soup.find("h1"), lambda: soup.find("h2"))
 
 def extract_exposants(soup):
-    txt = soup.get_text(" ", strip=True)
-    m = re.search(r"(\d+)\s*exposants", txt, flags=re.IGNORECASE)
-    if m:
-        try:
-            return int(m.group(1))
-        except:
-            return -1
-    return -1
+    return exposants_in(soup.get_text(" ", strip=True))
 
 #--------------------------------------
 
@@ -303,12 +245,15 @@ def clean_address_text(raw_text: str) -> str:
 
 
 def extract_address(soup):
-    section = soup.find("section", attrs={"x-ref": "locationSection"})
+    return _address_from(soup.find("section", attrs={"x-ref": "locationSection"}),
+                         lambda: soup.find(string=re.compile(r"Adresse", flags=re.IGNORECASE)))
+
+def _address_from(section, find_adresse_node):
     if section:
         return clean_address_text(section.get_text(" ", strip=True))
         
     # fallback: try to find element with 'Adresse' word around it
-    node = soup.find(string=re.compile(r"Adresse", flags=re.IGNORECASE))
+    node = find_adresse_node()
     if node:
         parent = node.find_parent()
         if parent:
@@ -316,79 +261,114 @@ def extract_address(soup):
             
     return "NA"
 
-def extract_ville_from_address(address: str):
-    if not address or address == "NA":
-        return "NA"
-        
-    parts = [p.strip() for p in address.split(",") if p.strip()]
-    
-    if parts:
-        # The last part should be the city and zip (e.g., '75002 Paris')
-        return parts[-1] 
-        
-    return "NA"
+# ----------------------------
+# Page -> manif record
+# ----------------------------
+# The extract_* functions above each walk the soup: fine for a one-off lookup, and
+# the reference tools/check_extract.py compares scrape_manif against.
+# scrape_manif reads the same nodes from a single PageScan traversal instead (EXTRACTOR = "scan").
+def extract_date_scan(scan):
+    date_str = date_from_time(scan.first.get("time"))  # Technique A
+    if date_str == FALLBACK_DATE:
+        date_str = _startdate_from_scripts(scan.ld_json)  # Technique B (JSON-LD)
+    if date_str == FALLBACK_DATE:
+        date_str = fr_date_in(scan.text)  # whole page regex
+    return date_str
+
+def scrape_manif_legacy(page_html, link):
+    """Field by field extraction (one traversal per field); kept as the reference output."""
+    page_soup = BeautifulSoup(page_html, "html.parser")
+    adresse = extract_address(page_soup)
+    return Manif.parsed(
+        Titre=extract_title(page_soup),
+        Exposants=extract_exposants(page_soup),
+        Adresse=adresse,
+        Ville=ville_from_address(adresse),
+        ManifDate=extract_date(page_soup),
+        ManifLink=link,
+    )
+
+def scrape_manif(page_html, link):
+    scan = PageScan(page_html)
+
+    date_str = extract_date_scan(scan)  # uses technique A then B
+    titre = title_from(scan.first.get("h1"), lambda: scan.first.get("h2"))
+    exposants = exposants_in(scan.text)
+    adresse = _address_from(scan.location_section, lambda: scan.adresse_node)
+    ville = ville_from_address(adresse)
+
+    return Manif.parsed(
+        Titre=titre,
+        Exposants=exposants,
+        Adresse=adresse,
+        Ville=ville,
+        ManifDate=date_str,
+        ManifLink=link,
+    )
+
+def manif_is_complete(manif: Manif) -> bool:
+    return manif.is_complete()
+
 # ----------------------------
 # Playwright page fetcher
 # ----------------------------
 def fetch_page_content(url, wait_ms=1000):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, wait_until="networkidle")
-        # small wait for Alpine.js to finish
-        page.wait_for_timeout(wait_ms)
-        html = page.content()
-        browser.close()
-        return html
+    # one-off fetch; main() shares a single browser through BrowserPool
+    result = fetch_pages([url], concurrency=1, wait_ms=wait_ms)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def is_event_href(href):
+    return "/evenement/" in href
+
+def parse_listing(listing_html, page_url):
+    """Event link -> text of its card on the listing (listing order), and the next results page."""
+    master_soup = make_soup(listing_html)  # whole tree: listing_card climbs the ancestors
+    cards = {}
+    for a in master_soup.find_all("a", href=True):
+        href = a["href"]
+        if is_event_href(href):
+            full = href if href.startswith("http") else "https://vide-greniers.org" + href
+            if full not in cards:
+                cards[full] = listing_card(a, is_event_href)
+    return cards, find_next_page(master_soup, page_url)
+
+async def crawl(listing_urls, manifest, concurrency=CONCURRENCY, fetch_mode=FETCH_MODE, on_record=None,
+                checkpoint=None):
+    """Discovery + event pages through the shared crawl (tools/eventcrawl.py), with this site's extractors."""
+    extract = scrape_manif if EXTRACTOR == "scan" else scrape_manif_legacy
+    return await crawl_listings(listing_urls, manifest, parse_listing, extract, manif_is_complete,
+                                event_ready=EVENT_READY_SELECTORS, master_ready=MASTER_READY_SELECTORS,
+                                concurrency=concurrency, fetch_mode=fetch_mode, on_record=on_record,
+                                checkpoint=checkpoint)
 # ----------------------------
 # Display helper
 # ----------------------------
-def display_manif(manif: dict):
+def display_manif(manif: Manif):
     # Print properties one per line, no labels
     # Order: Title, Exposants, Adresse, Ville, ManifDate, ManifLink
-    print(manif.get("Titre", "NA"))
-    print(manif.get("Exposants", -1))
-    print(manif.get("Adresse", "NA"))
-    print(manif.get("Ville", "NA"))
-    print(manif.get("ManifDate", FALLBACK_DATE))
-    print(manif.get("ManifLink", "NA"))
+    print(manif.Titre)
+    print(manif.Exposants)
+    print(manif.Adresse)
+    print(manif.Ville)
+    print(manif.ManifDate)
+    print(manif.ManifLink)
     print("-" * 50)
 # ----------------------------
 # Grouping and saving
 # ----------------------------
 def group_and_sort(manifs: list):
-    grouped = defaultdict(list)
-    for m in manifs:
-        grouped[m["ManifDate"]].append(m)
-
-    # sort groups by date (most recent first)
-    def key_for_date_str(ds: str):
-        dt = parse_fr_date_string(ds)
-        if dt:
-            return dt
-        # try parse ISO
-        iso_dt = parse_iso_date_str(ds)
-        if iso_dt:
-            return iso_dt
-        return datetime.min
-
-    sorted_dates = sorted(grouped.keys(), key=key_for_date_str, reverse=True)
-    grouped_sorted = {date: grouped[date] for date in sorted_dates}
-    # also sort items inside each group by Exposants descending
-    for date in grouped_sorted:
-        grouped_sorted[date] = sorted(grouped_sorted[date], key=lambda x: x.get("Exposants", -1), reverse=True)
-    return grouped_sorted
-
-def save_to_json(grouped: dict, output_dir=OUTPUT_DIR, prefix=OUTPUT_PREFIX):
-    now = datetime.now()
-    # build French-like short month name for filename (capitalize first 3 or full? we use abbreviated month with first letter capital)
-    month_name = MONTH_FR[now.month]
-    date_str = now.strftime("%d") + "_" + month_name + "_" + now.strftime("%Y_%H%M")
-    filename = f"{prefix}_{date_str}.json"
+    # groups by date (most recent first, undated last), Exposants descending inside each group;
+    # the days were parsed once when the records were built
+    return group_by_day(manifs, newest_first=True)
+
+def save_to_json(grouped: dict, output_dir=OUTPUT_DIR, filename=JSON_OUTPUT):
+    # a view, overwritten each run: older runs are queried from the event store, not from dated snapshots
     filepath = os.path.join(output_dir, filename)
     os.makedirs(output_dir, exist_ok=True)
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(grouped, f, indent=2, ensure_ascii=False)
+        json.dump({d: [m.to_dict() for m in ms] for d, ms in grouped.items()}, f, indent=2, ensure_ascii=False)
     print(f"Saved {filepath}")
     return filepath
 
@@ -462,12 +442,12 @@ def generate_html(grouped: dict, output_file="manifs.html"):
         ''')
 
         for e in events:
-            title_words = (e.get("Titre") or "").split()[:5]
+            title_words = (e.Titre or "").split()[:5]
             title_display = " ".join(title_words)
-            exp_value = e.get("Exposants", "")
+            exp_value = e.Exposants
             exp_display = f'<span class="exp-red">{exp_value}</span>' if isinstance(exp_value, int) and exp_value >= 400 else str(exp_value)
-            address = html.escape(e.get("Adresse", ""))
-            link = e.get("ManifLink", "#")
+            address = html.escape(e.Adresse or "")
+            link = e.ManifLink or "#"
 
             html_item = f'''
             <div class="list-group-item">
@@ -503,8 +483,9 @@ def generate_html(grouped: dict, output_file="manifs.html"):
       }
 
       // Init map
-      const homeCoords = [48.8256, 2.3259]; // 5 rue Victor Considérant, Paris
-      const map = L.map("map").setView(homeCoords, 12);
+''')
+    parts.append(f'      const homeCoords = [{HOME[0]}, {HOME[1]}]; // spatial.HOME: also where dist_km is measured from\n')
+    parts.append('''      const map = L.map("map").setView(homeCoords, 12);
 
       L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
         attribution: "&copy; OpenStreetMap contributors"
@@ -525,13 +506,13 @@ def generate_html(grouped: dict, output_file="manifs.html"):
     # Push events from Python → JS
     for date, events in grouped.items():
         for e in events:
-            lat = e.get("lat")
-            lon = e.get("lon")
+            lat = e.lat
+            lon = e.lon
             if not lat or not lon:
                 continue
-            title = (e.get("Titre") or "").replace("'", "\\'")
-            exp = e.get("Exposants", "")
-            addr = (e.get("Adresse") or "").replace("'", "\\'")
+            title = (e.Titre or "").replace("'", "\\'")
+            exp = e.Exposants
+            addr = (e.Adresse or "").replace("'", "\\'")
             parts.append(f"events.push({{name: '{title}', exposants: '{exp}', address: '{addr}', date: '{date}', lat: {lat}, lon: {lon} }});\n")
 
     # Add markers
@@ -559,47 +540,31 @@ def generate_html(grouped: dict, output_file="manifs.html"):
 # ----------------------------
 # Main flow
 # ----------------------------
-def main(master_url=MASTER_URL, output_dir=OUTPUT_DIR):
-    print("Fetching master page and extracting links...")
-    master_html = fetch_page_content(master_url)
-    master_soup = BeautifulSoup(master_html, "html.parser")
-    links = []
-    for a in master_soup.find_all("a", href=True):
-        href = a["href"]
-        if "/evenement/" in href:
-            full = href if href.startswith("http") else "https://vide-greniers.org" + href
-            if full not in links:
-                links.append(full)
-    print(f"[{len(links)}] Found event links")
-
-    manifs = []
-    for link in links:
-        try:
-            page_html = fetch_page_content(link)
-            page_soup = BeautifulSoup(page_html, "html.parser")
-
-            date_str = extract_date(page_soup)  # uses technique A then B
-            titre = extract_title(page_soup)
-            exposants = extract_exposants(page_soup)
-            adresse = extract_address(page_soup)
-            ville = extract_ville_from_address(adresse)
-
-            manif = {
-                "Titre": titre,
-                "Exposants": exposants,
-                "Adresse": adresse,
-                "Ville": ville,
-                "ManifDate": date_str,
-                "ManifLink": link
-            }
-
-            display_manif(manif)
-            manifs.append(manif)
-        except Exception as e:
-            print(f"Error extracting {link}: {e}")
-
-    grouped = group_and_sort(manifs)
-    save_to_json(grouped, output_dir=output_dir, prefix=OUTPUT_PREFIX)
+def main(master_url=MASTER_URL, output_dir=OUTPUT_DIR, concurrency=CONCURRENCY, fetch_mode=FETCH_MODE,
+         departements=DEPARTEMENTS):
+    run_started = datetime.now()
+    listing_urls = shard_listing_url(master_url, regions=departements)
+    manifest = ScrapeManifest(os.path.join(output_dir, MANIFEST_FILE), refresh_hours=MANIFEST_REFRESH_HOURS)
+    # the stream is also the checkpoint: without its end marker, the next run of this window resumes from it
+    with (EventStream(os.path.join(output_dir, STREAM_OUTPUT), key=run_key(listing_urls), resume=RESUME)
+          if STREAM_OUTPUT else nullcontext()) as stream:
+        manifs, stats = asyncio.run(crawl(listing_urls, manifest, concurrency=concurrency, fetch_mode=fetch_mode,
+                                          on_record=stream and stream.write, checkpoint=stream and stream.done))
+    for manif in manifs:
+        display_manif(manif)
+    print(stats.summary())
+
+    # the store is the system of record; JSON and HTML are views of what this run listed
+    with EventStore() as store:
+        store.upsert(EVENT_SOURCE, manifs, seen_at=run_started)
+        listed = store.query(source=EVENT_SOURCE, seen_since=run_started)
+        print(f"[store] {len(listed)} events upserted, {store.count()} in {store.path}")
+
+    if GEOCODE:
+        print(geocode_manifs(listed))
+        print(set_home_distance(listed))  # dist_km in the outputs: 'near home' filters without geocoding
+    grouped = group_and_sort(listed)
+    save_to_json(grouped, output_dir=output_dir)
     generate_html(grouped, output_file=os.path.join(output_dir, HTML_OUTPUT))
     
 
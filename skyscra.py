@@ -6,12 +6,29 @@
 import time
 import os
 import re
+import sys
 import json
+import asyncio
 import requests
 from datetime import datetime
-from collections import defaultdict
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+from browserpool import fetch_pages
+from eventfetch import MODE_TIERED
+from manifest import ScrapeManifest, listing_card
+from discovery import shard_listing_url, find_next_page
+from eventcrawl import crawl_listings
+from pagescan import PageScan, title_from, exposants_in, date_from_time, ville_from_address
+from htmlparse import make_soup
+from jsonpublish import JsonPublisher
+from eventstore import EventStore
+from manif import Manif, group_by_day
+from eventstream import EventStream, run_key
+from contextlib import nullcontext
+from frdates import FALLBACK_DATE, fr_date_in
+from geocode import geocode_manifs
+from spatial import set_home_distance
 
 # =================================================================
 # /////////////////// CONFIGURATION
@@ -19,7 +36,9 @@ from playwright.sync_api import sync_playwright
 
 # --- JSONHOSTING CONFIG ---
 # Rate limited to 100 requests/hour per IP • Max 1MB per JSON • No auth needed for GET
-JSON_URL = "https://jsonhosting.com/api/json/c3cdf9e5"   # JSONHosting API URL
+JSONHOSTING_BASE = os.environ.get("JSONHOSTING_BASE", "https://jsonhosting.com/api/json")  # tools/fakejsonhosting.py for local runs
+JSON_URL = f"{JSONHOSTING_BASE}/c3cdf9e5"   # JSONHosting API URL (index document in "sharded" mode)
+PUBLISH_MODE = os.environ.get("PUBLISH_MODE", "full")  # "full": one PATCH of everything | "sharded": compact monthly shards, changed ones only (tools/jsonpublish.py)
 EDIT_KEY = "01d3d54c95b3039f1758f48e7473dae365f00b03be449da84bd5d0fc237e894e" #os.getenv("EDIT_KEY")     # stored as GitHub secret
 
 # --- SCRAPING CONFIG ---
@@ -28,14 +47,22 @@ MIN_DATE = f"{YEAR}-11-10"
 MAX_DATE = f"{YEAR}-12-31"
 #MASTER_URL = f"https://vide-greniers.org/evenements/Ile-de-France?min=2025-11-22&max=2025-12-28&tags%5B0%5D=1"
 MASTER_URL = os.environ.get("MASTER_URL")
-
-# --- LOCALE ---
-FALLBACK_DATE = "01.01.0001"
-WEEKDAY_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
-MONTH_FR = {
-    1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril", 5: "Mai", 6: "Juin",
-    7: "Juillet", 8: "Août", 9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre"
-}
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "6"))  # pages loaded at the same time
+# MASTER_URL is split in weekly windows, and per département when given (e.g. "Paris-75,Essonne-91")
+DEPARTEMENTS = [d.strip() for d in os.environ.get("DEPARTEMENTS", "").split(",") if d.strip()]
+FETCH_MODE = os.environ.get("FETCH_MODE", MODE_TIERED)  # "tiered" (HTTP first) or "browser"
+# "legacy" (field by field) or "scan" (single PageScan pass, once tools/check_extract.py agrees on real pages)
+EXTRACTOR = os.environ.get("EXTRACTOR", "legacy")
+EVENT_READY_SELECTORS = ("h1", "time", "section[x-ref='locationSection']")  # what the extractors read
+MASTER_READY_SELECTORS = ("a[href*='/evenement/']",)
+# events scraped by previous runs (kept between CI runs by actions/cache)
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "skyscra_manifest.json")
+MANIFEST_REFRESH_HOURS = int(os.environ.get("MANIFEST_REFRESH_HOURS", "72"))
+EVENT_SOURCE = "vide-greniers"  # key of these events in the event store (.cache/events.sqlite)
+# one JSON line per event as soon as it is scraped, for tools tailing the run ("" : off)
+STREAM_PATH = os.environ.get("STREAM_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "skyscra_events.ndjson"))
+RESUME = os.environ.get("RESUME", "on") == "on"  # a run interrupted (crash, job timeout) on the same window resumes from STREAM_PATH
+GEOCODE = os.environ.get("GEOCODE", "on") == "on"  # lat/lon published with the events (tools/geocode.py, cache in .cache/)
 
 # ============================================
 # JSONHOSTING API HANDLER 
@@ -73,72 +100,44 @@ def update_jsonhosting(json_url: str, edit_key: str, data: dict, retries: int =
                 return False
 
 # ===============================================
-#  DATE UTILITIES
+#  DATE UTILITIES -> tools/frdates.py (parse_date, format_date_fr)
 # ===============================================
 
-def format_date_fr(dt: datetime) -> str:
-    if not isinstance(dt, datetime):
-        return FALLBACK_DATE
-    weekday = WEEKDAY_FR[dt.weekday()]
-    month = MONTH_FR[dt.month]
-    return f"{weekday} {dt.day} {month} {dt.year}"
-
-def parse_iso_date_str(s: str):
-    if not s:
-        return None
-    m = re.search(r"(\d{4})[-/](\d{2})[-/](\d{2})", s)
-    if m:
-        try:
-            return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
-        except ValueError:
-            return None
-    return None
-
-def parse_fr_date_string(s: str):
-    if not s or s == FALLBACK_DATE:
-        return None
-    pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+(\d{1,2})\s+([A-Za-zÀ-ÿ]+)\s+(\d{4})"
-    m = re.search(pattern, s, flags=re.IGNORECASE)
-    if not m:
-        return None
-    day = int(m.group(2))
-    month_name = m.group(3).capitalize()
-    year = int(m.group(4))
-    month_num = next((num for num, name in MONTH_FR.items() if name.lower() == month_name.lower()), None)
-    if not month_num:
-        return None
-    try:
-        return datetime(year, month_num, day)
-    except ValueError:
-        return None
-
 # =========================================
 #  SCRAPING LOGIC
 # =========================================
 
 def fetch_page_content(url, wait_ms=1000):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, wait_until="networkidle")
-        page.wait_for_timeout(wait_ms)
-        html_content = page.content()
-        browser.close()
-        return html_content
-
+    result = fetch_pages([url], concurrency=1, wait_ms=wait_ms)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def is_event_href(href):
+    return "/evenement/" in href
+
+def parse_listing(listing_html, page_url):
+    """Event link -> text of its listing card, and the next results page."""
+    master_soup = make_soup(listing_html)  # whole tree: listing_card climbs the ancestors
+    cards = {("https://vide-greniers.org" + a["href"]): listing_card(a, is_event_href)
+             for a in master_soup.find_all("a", href=True) if is_event_href(a["href"])}
+    return cards, find_next_page(master_soup, page_url)
+
+async def crawl(listing_urls, manifest, concurrency=CONCURRENCY, fetch_mode=FETCH_MODE, on_record=None,
+                checkpoint=None):
+    # discovery + event pages through the shared crawl (tools/eventcrawl.py)
+    extract = scrape_manif if EXTRACTOR == "scan" else scrape_manif_legacy
+    return await crawl_listings(listing_urls, manifest, parse_listing, extract, manif_is_complete,
+                                event_ready=EVENT_READY_SELECTORS, master_ready=MASTER_READY_SELECTORS,
+                                concurrency=concurrency, fetch_mode=fetch_mode, on_record=on_record,
+                                checkpoint=checkpoint)
+
+# field helpers shared with scra.py: tools/pagescan.py (title_from, exposants_in, date_from_time, ville_from_address)
 def extract_title(soup):
-    h1 = soup.find("h1")
-    if h1 and h1.get_text(strip=True):
-        return h1.get_text(" ", strip=True)
-    h2 = soup.find("h2")
-    if h2 and h2.get_text(strip=True):
-        return h2.get_text(" ", strip=True)
-    return "NA"
+    return title_from(soup.find("h1"), lambda: soup.find("h2"))
 
 def extract_exposants(soup):
-    txt = soup.get_text(" ", strip=True)
-    m = re.search(r"(\d+)\s*exposants", txt, flags=re.IGNORECASE)
-    return int(m.group(1)) if m else -1
+    return exposants_in(soup.get_text(" ", strip=True))
 
 def _normalize_paris_zip(city_part: str) -> str:
     match = re.search(r"Paris\s*(\d+)", city_part, re.IGNORECASE)
@@ -149,7 +148,9 @@ def _normalize_paris_zip(city_part: str) -> str:
     return city_part.strip()
 
 def extract_address(soup):
-    section = soup.find("section", attrs={"x-ref": "locationSection"})
+    return _address_from(soup.find("section", attrs={"x-ref": "locationSection"}))
+
+def _address_from(section):
     raw_text = section.get_text(" ", strip=True) if section else ""
     if "Accès" in raw_text and "Itinéraire" in raw_text:
         try:
@@ -166,39 +167,46 @@ def extract_address(soup):
         return ", ".join(dedup)
     return "NA"
 
-def extract_ville_from_address(address: str):
-    if not address or address == "NA":
-        return "NA"
-    parts = [p.strip() for p in address.split(",") if p.strip()]
-    return parts[-1] if parts else "NA"
-
 def extract_date(soup):
-    time_tag = soup.find("time")
-    if time_tag:
-        text = time_tag.get_text(" ", strip=True)
-        fr_pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}"
-        m = re.search(fr_pattern, text, flags=re.IGNORECASE)
-        if m:
-            return m.group(0).strip()
-        dt_attr = time_tag.get("datetime") or text
-        dt = parse_iso_date_str(dt_attr)
-        if dt:
-            return format_date_fr(dt)
-    text = soup.get_text(" ", strip=True)
-    pattern = r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}"
-    m = re.search(pattern, text, flags=re.IGNORECASE)
-    return m.group(0).strip() if m else FALLBACK_DATE
+    return _date_from(soup.find("time"), lambda: soup.get_text(" ", strip=True))
+
+def _date_from(time_tag, page_text):
+    # <time> element first, then the first label anywhere in the page (page_text() only when needed)
+    date_str = date_from_time(time_tag)
+    return date_str if date_str != FALLBACK_DATE else fr_date_in(page_text())
+
+def scrape_manif_legacy(page_html, link):
+    """Field by field extraction (one traversal per field); reference output for tools/check_extract.py."""
+    soup = BeautifulSoup(page_html, "html.parser")
+    adresse = extract_address(soup)
+    return Manif.parsed(
+        Titre=extract_title(soup),
+        Exposants=extract_exposants(soup),
+        Adresse=adresse,
+        Ville=ville_from_address(adresse),
+        ManifDate=extract_date(soup),
+        ManifLink=link,
+    )
+
+def scrape_manif(page_html, link):
+    # one traversal for every field, page text shared by the regex fallbacks
+    scan = PageScan(page_html)
+    adresse = _address_from(scan.location_section)
+    return Manif.parsed(
+        Titre=title_from(scan.first.get("h1"), lambda: scan.first.get("h2")),
+        Exposants=exposants_in(scan.text),
+        Adresse=adresse,
+        Ville=ville_from_address(adresse),
+        ManifDate=_date_from(scan.first.get("time"), lambda: scan.text),
+        ManifLink=link,
+    )
+
+def manif_is_complete(manif):
+    return manif.is_complete()
 
 def group_and_sort(manifs):
-    grouped = defaultdict(list)
-    for m in manifs:
-        grouped[m["ManifDate"]].append(m)
-    def key_for_date_str(ds):
-        dt = parse_fr_date_string(ds)
-        return dt if dt else datetime.min
-    sorted_dates = sorted(grouped.keys(), key=key_for_date_str, reverse=True)
-    grouped_sorted = {d: sorted(grouped[d], key=lambda x: x.get("Exposants", -1), reverse=True) for d in sorted_dates}
-    return grouped_sorted
+    # newest date first, biggest first inside a date; days come pre-parsed with each Manif
+    return group_by_day(manifs, newest_first=True)
 
 # ===========================================
 # /////////////// RUN IT ////////////////
@@ -208,32 +216,30 @@ def main():
     print("Starting Vide-Greniers Scraper...")
     print(f"Target URL: {MASTER_URL}")
 
-    master_html = fetch_page_content(MASTER_URL)
-    master_soup = BeautifulSoup(master_html, "html.parser")
-    links = list({("https://vide-greniers.org" + a["href"]) for a in master_soup.find_all("a", href=True) if "/evenement/" in a["href"]})
-    print(f"[{len(links)}] Found event links.")
-
-    manifs = []
-    for link in links:
-        print(f"\nScraping: {link}")
-        try:
-            page_html = fetch_page_content(link)
-            soup = BeautifulSoup(page_html, "html.parser")
-            manif = {
-                "Titre": extract_title(soup),
-                "Exposants": extract_exposants(soup),
-                "Adresse": extract_address(soup),
-                "Ville": extract_ville_from_address(extract_address(soup)),
-                "ManifDate": extract_date(soup),
-                "ManifLink": link
-            }
-            manifs.append(manif)
-            print(f"  -> {manif['Titre']} ({manif['ManifDate']})")
-        except Exception as e:
-            print(f"Error extracting {link}: {e}")
-
-    grouped_events = group_and_sort(manifs)
-    update_jsonhosting(JSON_URL, EDIT_KEY, grouped_events)
+    run_started = datetime.now()
+    manifest = ScrapeManifest(MANIFEST_PATH, refresh_hours=MANIFEST_REFRESH_HOURS)
+    listing_urls = shard_listing_url(MASTER_URL, regions=DEPARTEMENTS)
+    # the stream doubles as checkpoint: a run that dies before its end marker is resumed by the next one
+    with (EventStream(STREAM_PATH, key=run_key(listing_urls), resume=RESUME)
+          if STREAM_PATH else nullcontext()) as stream:
+        manifs, stats = asyncio.run(crawl(listing_urls, manifest, concurrency=CONCURRENCY, fetch_mode=FETCH_MODE,
+                                          on_record=stream and stream.write, checkpoint=stream and stream.done))
+    for manif in manifs:
+        print(f"  -> {manif.Titre} ({manif.ManifDate})")
+    print(stats.summary())
+
+    # published feed = view of the event store restricted to what this run listed
+    with EventStore() as store:
+        store.upsert(EVENT_SOURCE, manifs, seen_at=run_started)
+        listed = store.query(source=EVENT_SOURCE, seen_since=run_started)
+    if GEOCODE:
+        print(geocode_manifs(listed))
+        print(set_home_distance(listed))  # dist_km in the outputs: 'near home' filters without geocoding
+    grouped_events = group_and_sort(listed)
+    if PUBLISH_MODE == "sharded":
+        JsonPublisher(JSON_URL, EDIT_KEY, "skyscra", create_url=JSONHOSTING_BASE).publish(grouped_events)
+    else:
+        update_jsonhosting(JSON_URL, EDIT_KEY, {d: [m.to_dict() for m in ms] for d, ms in grouped_events.items()})
     print("\n✅ [SkyScrap] Scraping complete.")
 
 if __name__ == "__main__":
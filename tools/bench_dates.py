@@ -0,0 +1,172 @@
+"""
+        //////////////////  DATE PARSER BENCHMARK /////////////////////////////
+        frdates.parse_date against the per-script parsers it replaced, on the
+        date strings of a real run (event store / JSON outputs) or on a
+        generated corpus shaped like one (few distinct days, many events each).
+
+        python tools/bench_dates.py                          # generated corpus
+        python tools/bench_dates.py --store                  # labels of the event store
+        python tools/bench_dates.py OUTPUT_DIR/vg_manifs.json
+
+Reports µs per string for each parser (parse_date without cache, cold, warm),
+and every string on which the old and new parsers disagree.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+import frdates
+from frdates import parse_date, format_date_fr
+
+# =================================================================
+# /////////////////// REPLACED PARSERS (reference copies)
+# =================================================================
+MONTH_FR = {
+    1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril", 5: "Mai", 6: "Juin",
+    7: "Juillet", 8: "Août", 9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre"
+}
+FRENCH_MONTHS = {
+    'janvier': 'January', 'février': 'February', 'mars': 'March', 'avril': 'April', 'mai': 'May',
+    'juin': 'June', 'juillet': 'July', 'août': 'August',
+    'septembre': 'September', 'octobre': 'October', 'novembre': 'November', 'décembre': 'December'
+}
+FRENCH_WEEKDAYS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+
+
+def scra_parse_iso_date_str(s):
+    if not s:
+        return None
+    m = re.search(r"(\d{4})[-/](\d{2})[-/](\d{2})", s)
+    if m:
+        try:
+            return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            return None
+    return None
+
+def scra_parse_fr_date_string(s):
+    if not s or s == frdates.FALLBACK_DATE:
+        return None
+    m = re.search(r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+(\d{1,2})\s+([A-Za-zÀ-ÿ]+)\s+(\d{4})",
+                  s, flags=re.IGNORECASE)
+    if not m:
+        return None
+    month_num = None
+    for num, name in MONTH_FR.items():
+        if name.lower() == m.group(3).lower():
+            month_num = num
+            break
+    if not month_num:
+        return None
+    try:
+        return datetime(int(m.group(4)), month_num, int(m.group(2)))
+    except ValueError:
+        return None
+
+def scra_parse(s):
+    """What group_and_sort did: French label, else ISO."""
+    return scra_parse_fr_date_string(s) or scra_parse_iso_date_str(s)
+
+def skybroc_parse_french_date(date_str):
+    if not date_str:
+        return None
+    normalized = date_str.lower()
+    for fr, en in FRENCH_MONTHS.items():
+        normalized = normalized.replace(fr, en)
+    for fr in FRENCH_WEEKDAYS:
+        normalized = normalized.replace(fr, '')
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    for fmt in ['%d %B %Y', '%d %b %Y']:
+        try:
+            return datetime.strptime(normalized, fmt)
+        except ValueError:
+            continue
+    match = re.search(r'(\d{1,2}\s+(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4})',
+                      normalized, re.IGNORECASE)
+    if match:
+        return datetime.strptime(match.group(1).strip(), '%d %B %Y')
+    return None
+
+LEGACY = {"scra/skyscra": scra_parse, "skybroc": skybroc_parse_french_date}
+
+
+# =================================================================
+# /////////////////// CORPUS
+# =================================================================
+def generated_corpus(events=20000, seed=1):
+    """Eight weekends of events, in the shapes the sources publish (label, ISO, JSON-LD, dd/mm/yyyy)."""
+    rng = random.Random(seed)
+    start = date.today() + timedelta(days=(5 - date.today().weekday()) % 7)
+    days = [start + timedelta(weeks=w, days=d) for w in range(8) for d in (0, 1)]
+    shapes = [
+        lambda d: format_date_fr(d),                                  # vide-greniers label
+        lambda d: format_date_fr(d).lower(),                          # brocabrac <time> text
+        lambda d: d.isoformat(),                                      # <time datetime>
+        lambda d: f"{d.isoformat()}T08:00:00+01:00",                  # JSON-LD startDate
+        lambda d: d.strftime("%d/%m/%Y"),
+    ]
+    weights = [50, 25, 10, 10, 5]
+    corpus = [rng.choices(shapes, weights)[0](rng.choice(days)) for _ in range(events)]
+    corpus += [frdates.FALLBACK_DATE] * (events // 50)
+    rng.shuffle(corpus)
+    return corpus
+
+def labels_from_json(paths):
+    corpus = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        grouped = data.get("events", data) if isinstance(data, dict) else {}
+        for label, events in grouped.items():
+            corpus += [label] * (len(events) if isinstance(events, list) else 1)
+    return corpus
+
+def labels_from_store():
+    from eventstore import EventStore
+    with EventStore() as store:
+        return [row[0] for row in store.db.execute("SELECT date_label FROM events")]
+
+
+# =================================================================
+# /////////////////// RUN
+# =================================================================
+def timed(fn, corpus):
+    start = time.perf_counter()
+    results = [fn(s) for s in corpus]
+    return results, (time.perf_counter() - start) / max(len(corpus), 1) * 1e6
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the shared French date parser.")
+    parser.add_argument("files", nargs="*", help="JSON outputs ({date: [event]} or {events: {...}})")
+    parser.add_argument("--store", action="store_true", help="date labels of the event store")
+    parser.add_argument("--events", type=int, default=20000, help="size of the generated corpus")
+    args = parser.parse_args()
+
+    corpus = labels_from_json(args.files) if args.files else labels_from_store() if args.store else generated_corpus(args.events)
+    if not corpus:
+        sys.exit("No date strings found.")
+    print(f"{len(corpus)} date strings, {len(set(corpus))} distinct")
+
+    _, raw = timed(parse_date.__wrapped__, corpus)
+    print(f"  {'frdates.parse_date (no cache)':<28} {raw:8.2f} µs/string")
+    frdates.parse_date.cache_clear()
+    new, cold = timed(parse_date, corpus)
+    _, warm = timed(parse_date, corpus)
+    print(f"  {'frdates.parse_date (cold)':<28} {cold:8.2f} µs/string")
+    print(f"  {'frdates.parse_date (warm)':<28} {warm:8.2f} µs/string   {frdates.cache_info()}")
+    for name, fn in LEGACY.items():
+        old, per = timed(fn, corpus)
+        print(f"  {name:<28} {per:8.2f} µs/string   x{per / warm:.0f} slower than warm")
+        differ = {s: (as_date(o), n) for s, o, n in zip(corpus, old, new) if o and as_date(o) != n}
+        missed = {s for s, o, n in zip(corpus, old, new) if o is None and n is not None}
+        for s, (o, n) in sorted(differ.items()):
+            print(f"      differs: {s!r}: {o} != {n}")
+        if missed:
+            print(f"      {len(missed)} distinct strings read only by parse_date, e.g. {sorted(missed)[:3]}")
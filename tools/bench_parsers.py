@@ -0,0 +1,115 @@
+"""
+        //////////////////  PARSER BENCHMARK /////////////////////////////
+        Parse time and memory of every installed HTML backend, for a full tree
+        and for the restricted parses the scrapers use, on recorded pages.
+
+        python tools/bench_parsers.py https://vide-greniers.org/evenement/... https://brocabrac.fr/...
+        python tools/bench_parsers.py pages/vide-greniers pages/brocabrac pages/3ilmchar3i
+        python tools/bench_parsers.py --cache        # everything recorded in the HTTP cache
+
+URLs are fetched through the HTTP cache, so they are recorded for the next run.
+Memory is the tracemalloc peak of one parse (Python objects: the bs4 tree;
+selectolax keeps its tree in C and is reported as n/a).
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import tracemalloc
+from collections import defaultdict
+from urllib.parse import urlsplit
+from htmlparse import make_soup, keep, available_backends
+from httpcache import CachedSession, shared_cache
+
+try:
+    from selectolax.parser import HTMLParser  # optional: fastest, but not a BeautifulSoup tree
+except ImportError:
+    HTMLParser = None
+
+# restricted parses used by the scrapers
+SCENARIOS = {
+    "full": lambda: None,
+    "links": lambda: keep(("a", "link")),  # listing pages: skybroc.parse_listing_page
+    "spans": lambda: keep(("span",), with_attrs=("style",), strings=lambda t: "Bouton favoris" in t),  # cancelledEvent
+}
+
+
+def recorded_pages(sources, use_cache):
+    """{site: [html, ...]} from directories / files (site = directory name), URLs and the HTTP cache."""
+    pages = defaultdict(list)
+    session = None
+    for source in sources:
+        if source.startswith(("http://", "https://")):
+            session = session or CachedSession()
+            response = session.get(source, timeout=15)
+            response.raise_for_status()
+            pages[urlsplit(source).hostname].append(response.text)
+        elif os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.endswith((".html", ".htm")):
+                    with open(os.path.join(source, name), "rb") as f:
+                        pages[os.path.basename(os.path.normpath(source))].append(f.read().decode("utf-8", "replace"))
+        else:
+            with open(source, "rb") as f:
+                pages[os.path.basename(os.path.dirname(os.path.abspath(source)))].append(f.read().decode("utf-8", "replace"))
+    if session:
+        session.close()
+    if use_cache:
+        cache = shared_cache()
+        for url in list(cache._index):
+            _, body = cache.lookup(url)
+            if body and b"<html" in body[:2048].lower():
+                pages[urlsplit(url).hostname].append(body.decode("utf-8", "replace"))
+    return pages
+
+def measure(parse, docs, repeat):
+    """(median ms per page, peak KiB of the largest page or None)"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            parse(doc)
+        runs.append((time.perf_counter() - start) * 1000 / len(docs))
+    if parse.__name__ == "selectolax":
+        return statistics.median(runs), None
+    largest = max(docs, key=len)
+    tracemalloc.start()
+    tree = parse(largest)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del tree
+    return statistics.median(runs), peak / 1024
+
+def parsers():
+    found = []
+    for backend in available_backends():
+        for scenario, make_filter in SCENARIOS.items():
+            def parse(doc, backend=backend, make_filter=make_filter):
+                return make_soup(doc, make_filter(), parser=backend)
+            found.append((f"{backend} / {scenario}", parse))
+    if HTMLParser is not None:
+        def selectolax(doc):
+            return HTMLParser(doc)
+        found.append(("selectolax / full", selectolax))
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on recorded pages.")
+    parser.add_argument("sources", nargs="*", help="URLs, .html files or directories (one per site)")
+    parser.add_argument("--cache", action="store_true", help="also use every page recorded in the HTTP cache")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sites = recorded_pages(args.sources, args.cache)
+    if not sites:
+        sys.exit("No recorded pages found.")
+    for site, docs in sites.items():
+        size = sum(len(d) for d in docs) / len(docs) / 1024
+        print(f"\n{site}: {len(docs)} pages, {size:.0f} KiB on average")
+        print(f"  {'backend / parse':<28}{'ms/page':>10}{'peak KiB':>12}")
+        for label, parse in parsers():
+            ms, peak = measure(parse, docs, args.repeat)
+            print(f"  {label:<28}{ms:>10.2f}{(f'{peak:.0f}' if peak is not None else 'n/a'):>12}")
@@ -0,0 +1,164 @@
+"""
+        //////////////////  BROWSER POOL /////////////////////////////
+        One headless Chromium per run, pages served from a bounded pool.
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from ratelimit import HttpStatusError, RETRY_STATUSES, shared_limiter
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+DEFAULT_CONCURRENCY = 6      # pages loading at the same time
+DEFAULT_WAIT_MS = 1000       # small wait for Alpine.js to finish
+DEFAULT_TIMEOUT_MS = 30000   # navigation timeout per page
+READY_TIMEOUT_MS = 5000      # max wait for the ready selectors once the DOM is parsed
+# extraction only reads the DOM: never download these
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest", "other"}
+# third-party hosts still allowed to serve scripts (front-end frameworks such as Alpine.js)
+SCRIPT_CDN_HOSTS = {"cdn.jsdelivr.net", "unpkg.com", "cdnjs.cloudflare.com"}
+
+# true once every selector matches an element with some text in it
+_READY_JS = "sels => sels.every(s => { const el = document.querySelector(s); return el && el.textContent.trim().length > 0; })"
+
+
+class NavigationTimeout(Exception):
+    """A page that did not load in timeout_ms: not retried by the limiter (the HTTP tier may still get it)."""
+
+
+def _site(host):
+    """'www.vide-greniers.org' -> 'vide-greniers.org'"""
+    return ".".join(host.split(".")[-2:])
+
+def is_blocked_request(resource_type, request_host, page_host):
+    """Decides whether a sub-request of a page on page_host is aborted."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    if not page_host or _site(request_host) == _site(page_host):
+        return False
+    return not (resource_type == "script" and request_host in SCRIPT_CDN_HOSTS)
+
+
+class BrowserPool:
+    """Keeps one browser alive and lends out a fixed set of reusable pages."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, wait_ms=DEFAULT_WAIT_MS,
+                 timeout_ms=DEFAULT_TIMEOUT_MS, headless=True,
+                 ready_selectors=None, block_resources=True, limiter=None):
+        self.concurrency = max(1, int(concurrency))
+        self.wait_ms = wait_ms
+        self.timeout_ms = timeout_ms
+        self.headless = headless
+        self.ready_selectors = tuple(ready_selectors or ())
+        self.block_resources = block_resources
+        self.blocked = 0  # sub-requests aborted during this run
+        self.limiter = limiter if limiter is not None else shared_limiter()  # same pacing as the HTTP tier
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages = None
+        self._page_hosts = {}  # page -> host of the document it is loading
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context()
+        self._pages = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._pages.put_nowait(await self._new_page())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._context.close()
+            await self._browser.close()
+        finally:
+            await self._playwright.stop()
+
+    async def _new_page(self):
+        page = await self._context.new_page()
+        page.set_default_timeout(self.timeout_ms)
+        if self.block_resources:
+            async def route_handler(route):
+                request = route.request
+                if request.is_navigation_request():
+                    return await route.continue_()
+                host = urlsplit(request.url).hostname or ""
+                if is_blocked_request(request.resource_type, host, self._page_hosts.get(page)):
+                    self.blocked += 1
+                    return await route.abort()
+                await route.continue_()
+            await page.route("**/*", route_handler)
+        return page
+
+    async def _replace_page(self, page):
+        # a page that crashed or hung mid-navigation is not handed out again
+        self._page_hosts.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            pass
+        return await self._new_page()
+
+    async def _wait_ready(self, page, selectors):
+        try:
+            await page.wait_for_function(_READY_JS, arg=list(selectors), timeout=READY_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            pass  # a page without e.g. an address block is still extracted as-is
+
+    async def fetch(self, url, wait_ms=None, ready=None):
+        """
+        Returns the rendered HTML of url, waiting for the host limiter and a free page first.
+        With ready selectors (argument or pool default) the page is returned as soon as they
+        are filled in; without, the old networkidle + fixed wait is used.
+        Throttled (429/503) or failed navigations are retried by the limiter; load times are
+        not fed to its AIMD window (a rendered page takes longer than TARGET_LATENCY anyway).
+        A navigation timeout is not retried: MAX_RETRIES x timeout_ms would stall a page slot.
+        """
+        selectors = tuple(ready) if ready is not None else self.ready_selectors
+        return await self.limiter.call_async(url, lambda: self._load(url, wait_ms, selectors),
+                                             retry_exceptions=(HttpStatusError, PlaywrightError), timed=False)
+
+    async def _load(self, url, wait_ms, selectors):
+        page = await self._pages.get()
+        try:
+            self._page_hosts[page] = urlsplit(url).hostname or ""
+            if selectors:
+                response = await page.goto(url, wait_until="domcontentloaded")
+            else:
+                response = await page.goto(url, wait_until="networkidle")
+            if response is not None and response.status in RETRY_STATUSES:
+                raise HttpStatusError(response.status, response.headers, url)
+            if selectors:
+                await self._wait_ready(page, selectors)
+            else:
+                await page.wait_for_timeout(self.wait_ms if wait_ms is None else wait_ms)
+            return await page.content()
+        except PlaywrightTimeoutError as e:
+            page = await self._replace_page(page)
+            raise NavigationTimeout(f"{url}: no answer in {self.timeout_ms} ms") from e
+        except Exception:
+            page = await self._replace_page(page)
+            raise
+        finally:
+            self._pages.put_nowait(page)
+
+    async def fetch_all(self, urls, wait_ms=None, ready=None):
+        """
+        Loads all urls concurrently (bounded by the pool size).
+        Results are in the same order as urls; a failed page is returned as its exception.
+        """
+        return await asyncio.gather(*(self.fetch(u, wait_ms, ready) for u in urls), return_exceptions=True)
+
+
+# ----------------------------
+# Sync helpers
+# ----------------------------
+def fetch_pages(urls, concurrency=DEFAULT_CONCURRENCY, wait_ms=DEFAULT_WAIT_MS, ready_selectors=None):
+    """Sync wrapper around BrowserPool.fetch_all for callers without an event loop."""
+    async def _run():
+        async with BrowserPool(concurrency=concurrency, wait_ms=wait_ms, ready_selectors=ready_selectors) as pool:
+            return await pool.fetch_all(urls)
+    return asyncio.run(_run())
@@ -1,5 +1,9 @@
 import requests
-from bs4 import BeautifulSoup
+from httpcache import CachedSession
+from htmlparse import make_soup, keep
+
+SESSION = CachedSession()
+SPANS_AND_MARKER = keep(('span',), with_attrs=('style',), strings=lambda text: 'Bouton favoris' in text)
 
 def fetch_page_content(url: str) -> str:
     """
@@ -10,7 +14,7 @@ def fetch_page_content(url: str) -> str:
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = SESSION.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         return response.text
     except requests.RequestException as e:
@@ -21,7 +25,8 @@ def is_event_cancelled(html_content: str) -> bool:
     Check if the event is cancelled by looking for 'Annulé' in the specific location:
     After the date and before the favorites button comment.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # only spans, styled containers (parent colour check) and the favourites marker are built
+    soup = make_soup(html_content, SPANS_AND_MARKER)
     
     # Method 1: Look for the favorites button comment and check what comes before it
     favorites_comment = soup.find(string=lambda text: text and 'Bouton favoris' in text)
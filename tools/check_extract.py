@@ -0,0 +1,77 @@
+"""
+        //////////////////  EXTRACTOR CHECK /////////////////////////////
+        Runs the single-pass scrape_manif of scra.py / skyscra.py and their
+        field-by-field scrape_manif_legacy on saved event pages, reports every
+        field that differs and how long each extractor took.
+
+        python tools/check_extract.py pages/*.html
+        python tools/check_extract.py --cache          # event pages in the HTTP cache
+
+The scrapers keep EXTRACTOR = "legacy" until this reports 0 differing fields on
+real pages: run skyscra.py (or scra.py) once in FETCH_MODE "tiered" so the event
+pages it downloads land in the HTTP cache, then run --cache (or save pages by
+hand into a directory). Synthetic pages alone don't cover the site's markup.
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+from httpcache import shared_cache, REPO_DIR
+
+sys.path.insert(0, REPO_DIR)
+
+
+def saved_pages(paths, use_cache):
+    """[(link, html)] from .html files / directories and, optionally, the HTTP cache."""
+    pages = []
+    for path in paths:
+        files = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        for f in files:
+            if f.endswith((".html", ".htm")):
+                with open(f, "rb") as fh:
+                    pages.append((f, fh.read().decode("utf-8", errors="replace")))
+    if use_cache:
+        cache = shared_cache()
+        for url in list(cache._index):
+            if "/evenement/" in url:
+                _, body = cache.lookup(url)
+                if body:
+                    pages.append((url, body.decode("utf-8", errors="replace")))
+    return pages
+
+def timed(fn, pages):
+    start = time.perf_counter()
+    records = [fn(page_html, link) for link, page_html in pages]
+    return records, time.perf_counter() - start
+
+def check(module_name, pages):
+    module = importlib.import_module(module_name)
+    legacy, t_legacy = timed(module.scrape_manif_legacy, pages)
+    single, t_single = timed(module.scrape_manif, pages)
+    mismatches = 0
+    for (link, _), old, new in zip(pages, legacy, single):
+        old, new = old.to_dict(), new.to_dict()
+        for key in old:
+            if old[key] != new.get(key):
+                mismatches += 1
+                print(f"  [{module_name}] {link}\n      {key}: {old[key]!r} != {new.get(key)!r}")
+    speedup = t_legacy / t_single if t_single else float("inf")
+    print(f"[{module_name}] {len(pages)} pages, {mismatches} differing fields | "
+          f"per-field {t_legacy * 1000:.0f} ms, single pass {t_single * 1000:.0f} ms (x{speedup:.2f})")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single-pass and per-field event extractors.")
+    parser.add_argument("paths", nargs="*", help=".html files or directories of saved event pages")
+    parser.add_argument("--cache", action="store_true", help="also use the event pages stored in the HTTP cache")
+    parser.add_argument("--scripts", default="scra,skyscra", help="comma separated modules to check")
+    args = parser.parse_args()
+
+    pages = saved_pages(args.paths, args.cache)
+    if not pages:
+        sys.exit("No saved pages found.")
+    failed = sum(check(name.strip(), pages) for name in args.scripts.split(",") if name.strip())
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,164 @@
+"""
+        //////////////////  LOGIC CHECK /////////////////////////////
+        Self-check of the pieces that are easy to get subtly wrong and that the
+        benches only time: French date labels, resuming an event stream whose
+        last line was cut mid-write, the scrape manifest plan, image dedupe.
+
+        python tools/check_logic.py
+        python tools/check_logic.py --only dates,stream
+
+Prints one line per check, the failures in detail, and exits 1 if any failed.
+No network, nothing written outside a temporary directory.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+from datetime import date, datetime, timedelta
+from frdates import FALLBACK_DATE, parse_date, format_date_fr, fr_date_in
+from eventstream import EventStream, read_events, run_key
+from manifest import ScrapeManifest
+from manif import Manif
+
+failures = []
+
+
+def expect(name, got, wanted):
+    if got != wanted:
+        failures.append(f"{name}: got {got!r}, expected {wanted!r}")
+        return False
+    return True
+
+
+# =================================================================
+# /////////////////// CHECKS
+# =================================================================
+def check_dates():
+    """format_date_fr -> parse_date round-trip over two years, plus the other spellings met on the sources."""
+    ok = True
+    day = date(2025, 1, 1)
+    for _ in range(2 * 366):
+        label = format_date_fr(day)
+        ok &= expect(f"round-trip {day}", parse_date(label), day)
+        ok &= expect(f"label in text {day}", fr_date_in(f"Le {label} de 8h à 18h"), label)
+        day += timedelta(days=1)
+    for text, wanted in [("Samedi 15 novembre 2025", date(2025, 11, 15)), ("1er déc. 2025", date(2025, 12, 1)),
+                         ("15 Nov 2025", date(2025, 11, 15)), ("2025-11-15T08:00:00+01:00", date(2025, 11, 15)),
+                         ("15/11/2025", date(2025, 11, 15)), ("15.11.2025", date(2025, 11, 15)),
+                         ("31 février 2025", None), (FALLBACK_DATE, None), ("NA/Unparsed Date (01.01.0001)", None),
+                         ("", None), (None, None)]:
+        ok &= expect(f"parse_date({text!r})", parse_date(text), wanted)
+    ok &= expect("format_date_fr(None)", format_date_fr(None), FALLBACK_DATE)
+    ok &= expect("format_date_fr(datetime)", format_date_fr(datetime(2025, 10, 5, 9, 30)), "Dimanche 5 Octobre 2025")
+    ok &= expect("fr_date_in(no date)", fr_date_in("pas de date ici"), FALLBACK_DATE)
+    return ok
+
+def _manif(i):
+    return Manif.parsed(Titre=f"manif {i}", Exposants=10 * i, Adresse=f"{i} rue X, 75014 Paris", Ville="75014 Paris",
+                        ManifDate=format_date_fr(date(2025, 11, 1 + i)), ManifLink=f"https://example.org/evenement/{i}")
+
+def check_stream(tmp):
+    """An interrupted run resumes its events; a half-written last line is dropped; finished runs don't resume."""
+    ok = True
+    path = os.path.join(tmp, "events.ndjson")
+    key = run_key("https://example.org/evenements?min=2025-11-01", ["Paris-75"])
+
+    stream = EventStream(path, key=key, resume=True)
+    for i in range(3):
+        stream.write(_manif(i))
+    stream.close(completed=False)
+    with open(path, "ab") as f:  # killed in the middle of the fourth line
+        f.write(json.dumps(_manif(3).to_dict()).encode("utf-8")[:25])
+    size_before = os.path.getsize(path)
+
+    stream = EventStream(path, key=key, resume=True)
+    ok &= expect("resumed links", sorted(stream.done), sorted(_manif(i).ManifLink for i in range(3)))
+    ok &= expect("resumed record", stream.done[_manif(1).ManifLink].to_dict(), _manif(1).to_dict())
+    ok &= expect("cut tail truncated", os.path.getsize(path), size_before - 25)
+    stream.write(_manif(3))
+    stream.close(completed=True)
+    ok &= expect("events after resume", [m.ManifLink for m in read_events(path)],
+                 [_manif(i).ManifLink for i in range(4)])
+
+    ok &= expect("finished run not resumed", EventStream(path, key=key, resume=True).done, {})
+    other = os.path.join(tmp, "other.ndjson")
+    stream = EventStream(other, key=key, resume=True)
+    stream.write(_manif(0))
+    stream.close(completed=False)
+    ok &= expect("other window not resumed", EventStream(other, key=run_key("another window"), resume=True).done, {})
+    return ok
+
+def check_manifest(tmp):
+    """plan(): new, changed-card and stale links are fetched; fresh unchanged ones are reused, in listing order."""
+    ok = True
+    path = os.path.join(tmp, "manifest.json")
+    now = datetime(2025, 11, 10, 12, 0)
+    manifest = ScrapeManifest(path, refresh_hours=72)
+    for name in ("fresh", "changed", "stale"):
+        fetched = now - timedelta(hours=100 if name == "stale" else 1)
+        manifest.update(name, f"card {name}", {"Titre": name}, now=fetched)
+    manifest.save()
+
+    manifest = ScrapeManifest(path, refresh_hours=72)
+    cards = {"new": "card new", "stale": "card stale", "fresh": "card fresh", "changed": "card changed (2 exposants)"}
+    to_fetch, reused = manifest.plan(cards, now=now)
+    ok &= expect("to fetch", to_fetch, ["new", "stale", "changed"])
+    ok &= expect("reused", reused, {"fresh": {"Titre": "fresh"}})
+
+    manifest.save(listed_links=["fresh", "new"])
+    ok &= expect("prune to listed links", sorted(ScrapeManifest(path).entries), ["fresh"])
+    return ok
+
+def check_dedupe():
+    """dedupe_images(): a repeat in the same folder is dropped, in another folder it shares the first src."""
+    try:
+        from PIL import Image
+        import router
+    except ImportError as e:
+        print(f"  dedupe skipped: {e}")
+        return True
+    rng = random.Random(1)
+    size = (120, 90)
+
+    def noise(seed):
+        r = random.Random(seed)
+        return Image.frombytes("RGB", size, bytes(r.randrange(256) for _ in range(size[0] * size[1] * 3)))
+
+    def entry(img, folder, src):
+        return {"folder": folder, "name": src, "src": src, "width": img.width, "height": img.height,
+                "fingerprint": router.image_fingerprint(img)}
+
+    base = noise(1)
+    near = base.copy()
+    near.putpixel((rng.randrange(size[0]), rng.randrange(size[1])), (0, 0, 0))  # one pixel: same image
+    images = [entry(base, "route1", "a.png"), entry(near, "route1", "b.png"),  # repeat, same folder
+              entry(noise(2), "route1", "c.png"),                               # different image
+              entry(base, "route2", "d.png")]                                   # repeat, other folder
+    images[1]["route_timing_info"] = "8:10 AM - 8:48 AM (38 min)"
+    kept = router.dedupe_images(images)
+    ok = expect("kept", [(e["folder"], e["name"], e["src"]) for e in kept],
+                [("route1", "a.png", "a.png"), ("route1", "c.png", "c.png"), ("route2", "d.png", "a.png")])
+    ok &= expect("timing of a dropped repeat kept", kept[0].get("route_timing_info"), "8:10 AM - 8:48 AM (38 min)")
+    return ok
+
+
+CHECKS = {"dates": check_dates, "stream": check_stream, "manifest": check_manifest, "dedupe": check_dedupe}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Self-check of dates, stream resume, manifest plan and dedupe.")
+    parser.add_argument("--only", default=",".join(CHECKS), help="comma separated checks: " + ", ".join(CHECKS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in (n.strip() for n in args.only.split(",") if n.strip()):
+            check = CHECKS[name]
+            before = len(failures)
+            passed = check(tmp) if check.__code__.co_argcount else check()
+            print(f"[{name}] {'ok' if passed else f'{len(failures) - before} failures'}")
+    for failure in failures:
+        print(f"  {failure}")
+    sys.exit(1 if failures else 0)
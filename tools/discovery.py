@@ -0,0 +1,146 @@
+"""
+        //////////////////  LISTING DISCOVERY /////////////////////////////
+        Splits a listing search into weekly windows x départements, loads the
+        shard pages concurrently, follows their pagination and merges every
+        event link through one deduplicating frontier.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+WINDOW_DAYS = 7
+MAX_PAGES_PER_SHARD = 30  # safety net against pagination loops
+NEXT_PAGE_LABELS = ("suivant", "suivante", "page suivante", "next", "›", "»")
+
+
+# ----------------------------
+# Shards
+# ----------------------------
+def weekly_windows(min_date, max_date, days=WINDOW_DAYS):
+    """[(start, end), ...] covering min_date..max_date (inclusive), as ISO strings."""
+    start, end = date.fromisoformat(str(min_date)), date.fromisoformat(str(max_date))
+    windows = []
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop + timedelta(days=1)
+    return windows
+
+def shard_listing_url(url, regions=(), region_segment=-1, min_key="min", max_key="max", range_key=None):
+    """
+    One listing URL -> one URL per weekly window and région/département.
+    vide-greniers: /evenements/Ile-de-France?min=2025-11-10&max=2025-12-31 (region_segment=-1)
+    brocabrac:     /ile-de-france/vide-grenier/?d=2025-11-22,2025-12-28   (region_segment=0, range_key="d")
+    Without dates in the URL only the regions are split; without regions only the dates.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if range_key and "," in query.get(range_key, ""):
+        lo, hi = query[range_key].split(",", 1)
+    else:
+        lo, hi = query.get(min_key), query.get(max_key)
+    try:
+        windows = weekly_windows(lo, hi)
+    except (TypeError, ValueError):
+        windows = [None]
+
+    segments = parts.path.split("/")
+    named = [i for i, s in enumerate(segments) if s]
+    paths = [parts.path]
+    if regions and named:
+        idx = named[region_segment]
+        paths = ["/".join(segments[:idx] + [r] + segments[idx + 1:]) for r in regions]
+
+    urls = []
+    for path in paths:
+        for window in windows:
+            q = dict(query)
+            if window and range_key:
+                q[range_key] = f"{window[0]},{window[1]}"
+            elif window:
+                q[min_key], q[max_key] = window
+            urls.append(urlunsplit((parts.scheme, parts.netloc, path, urlencode(q, safe=","), parts.fragment)))
+    return urls
+
+def find_next_page(soup, page_url):
+    """Absolute URL of the next results page, or None."""
+    tag = soup.find(["a", "link"], rel="next", href=True)
+    if tag is None:
+        for a in soup.find_all("a", href=True):
+            label = (a.get_text(" ", strip=True) or a.get("aria-label") or a.get("title") or "").lower()
+            if label in NEXT_PAGE_LABELS:
+                tag = a
+                break
+    if tag is None:
+        return None
+    return urljoin(page_url, tag["href"])
+
+
+# ----------------------------
+# Frontier
+# ----------------------------
+class Frontier:
+    """Event link -> listing card text, first-seen order, each link once."""
+
+    def __init__(self):
+        self.cards = {}
+        self.duplicates = 0
+
+    def add_all(self, cards):
+        added = 0
+        for link, card in cards.items():
+            if link in self.cards:
+                self.duplicates += 1
+            else:
+                self.cards[link] = card
+                added += 1
+        return added
+
+
+async def discover(shard_urls, fetch_many, parse_listing):
+    """
+    fetch_many(urls) -> awaitable list of html (or exceptions), same order as urls.
+    parse_listing(html, page_url) -> ({event link: card text}, next page url or None).
+    Pages are loaded level by level: page 1 of every shard together, then every page 2...
+    Returns (cards, complete): complete is False when any listing page failed to load,
+    so callers must not treat a link missing from cards as gone from the site.
+    """
+    frontier = Frontier()
+    level = list(dict.fromkeys(shard_urls))
+    seen_pages = set(level)
+    depth, loaded, failed = 0, 0, 0
+    while level and depth < MAX_PAGES_PER_SHARD:
+        pages = await fetch_many(level)
+        next_level = []
+        for url, listing_html in zip(level, pages):
+            if isinstance(listing_html, Exception):
+                print(f"Error loading listing {url}: {listing_html}")
+                failed += 1
+                continue
+            loaded += 1
+            cards, next_url = parse_listing(listing_html, url)
+            frontier.add_all(cards)
+            if cards and next_url and next_url not in seen_pages:
+                seen_pages.add(next_url)
+                next_level.append(next_url)
+        level = next_level
+        depth += 1
+    print(f"[discovery] {len(frontier.cards)} event links from {loaded} listing pages "
+          f"({len(shard_urls)} shards, {frontier.duplicates} duplicates merged, {failed} failed)")
+    return frontier.cards, failed == 0
+
+def discover_sync(shard_urls, fetch_one, parse_listing, workers=8):
+    """discover() for blocking fetchers: fetch_one(url) -> html runs on a thread pool. Returns (cards, complete)."""
+    async def _run():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            async def fetch_many(urls):
+                return await asyncio.gather(*(loop.run_in_executor(executor, fetch_one, u) for u in urls),
+                                            return_exceptions=True)
+            return await discover(shard_urls, fetch_many, parse_listing)
+    return asyncio.run(_run())
@@ -0,0 +1,59 @@
+"""
+        //////////////////  LISTING CRAWL /////////////////////////////
+        The crawl shared by scra.py and skyscra.py: sharded listing discovery
+        through one browser pool, then only the event pages the manifest
+        cannot answer for (tiered HTTP / browser fetch), with the manifest and
+        the resume checkpoint kept up to date.
+
+The manifest only forgets links missing from the listing when every listing page
+loaded: a failed shard would otherwise drop (and re-scrape) all its events.
+"""
+
+from browserpool import BrowserPool
+from discovery import discover
+from eventfetch import fetch_events, MODE_TIERED
+from manif import Manif
+
+
+async def crawl_listings(listing_urls, manifest, parse_listing, scrape_manif, is_complete,
+                         event_ready=(), master_ready=(), concurrency=6, fetch_mode=MODE_TIERED,
+                         on_record=None, checkpoint=None):
+    """
+    Discovers event links over all listing shards, then loads only the event pages
+    the manifest can't answer for; manifs keep the discovery order. Returns (manifs, fetch stats).
+    on_record(manif) gets each event as soon as it is known (manifest hits first).
+    checkpoint: {link: Manif} already scraped by an interrupted run of the same window (not emitted again).
+    """
+    emit = on_record or (lambda manif: None)
+    checkpoint = checkpoint or {}
+    async with BrowserPool(concurrency=concurrency, ready_selectors=event_ready) as pool:
+        print(f"Fetching {len(listing_urls)} listing pages and extracting links...")
+        cards, complete = await discover(listing_urls, lambda urls: pool.fetch_all(urls, ready=master_ready),
+                                         parse_listing)
+        to_fetch, reused = manifest.plan(cards)
+        resumed = {link: checkpoint[link] for link in to_fetch if link in checkpoint}
+        to_fetch = [link for link in to_fetch if link not in resumed]
+        print(f"[{len(cards)}] Found event links, {len(to_fetch)} to scrape, {len(resumed)} resumed from the checkpoint")
+        # the manifest stores plain dicts (JSON); manifs are Manif records from here on
+        reused = {link: Manif.from_dict(record) for link, record in reused.items()}
+        for link, record in reused.items():
+            if link not in checkpoint:
+                emit(record)
+        records, stats = await fetch_events(to_fetch, scrape_manif, is_complete, pool, mode=fetch_mode,
+                                            on_record=emit)
+        print(f"[browser] {pool.blocked} sub-requests blocked")
+
+    for link, record in list(zip(to_fetch, records)) + list(resumed.items()):
+        if record:
+            manifest.update(link, cards[link], record.to_dict())
+            reused[link] = record
+        elif link in manifest.entries:
+            reused[link] = Manif.from_dict(manifest.entries[link]["record"])  # failed refresh: keep last known
+            emit(reused[link])
+    print(manifest.summary(len(cards) - len(to_fetch)))
+    if complete:
+        manifest.save(listed_links=cards)
+    else:
+        print("[manifest] some listing pages failed: nothing pruned this run")
+        manifest.save()
+    return [reused[link] for link in cards if link in reused], stats
@@ -0,0 +1,114 @@
+"""
+        //////////////////  EVENT FETCHER /////////////////////////////
+        Tiered event page loading: plain HTTP first, Playwright only
+        for the pages whose extracted fields come back incomplete.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from httpcache import CachedSession
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+HTTP_WORKERS = 16    # concurrent HTTP requests (and pooled keep-alive connections)
+HTTP_TIMEOUT = 15
+MODE_TIERED = "tiered"    # HTTP first, browser only for incomplete pages
+MODE_BROWSER = "browser"  # every page through Playwright (previous behaviour)
+
+
+@dataclass
+class FetchStats:
+    """Per-run counters: how each page was finally obtained."""
+    http: int = 0     # complete from plain HTTP
+    browser: int = 0  # needed the Playwright fallback
+    partial: int = 0  # browser fallback failed, the incomplete HTTP record was kept
+    errors: int = 0   # no record at all
+
+    def summary(self) -> str:
+        total = self.http + self.browser + self.partial + self.errors
+        return (f"[fetch] {total} pages: {self.http} via HTTP, {self.browser} needed the browser, "
+                f"{self.partial} partial, {self.errors} errors")
+
+
+def make_session(pool_size=HTTP_WORKERS):
+    """Cached session whose connection pool is large enough for all workers."""
+    session = CachedSession()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(REQUEST_HEADERS)
+    return session
+
+def _http_extract(session, link, extract):
+    response = session.get(link, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return extract(response.text, link)
+
+async def fetch_events(links, extract, is_complete, pool, mode=MODE_TIERED, session=None, workers=HTTP_WORKERS,
+                       on_record=None):
+    """
+    extract(html, link) -> record, is_complete(record) -> bool, pool is an open BrowserPool.
+    Returns (records, stats); records follow the order of links, None where both tiers failed.
+    on_record(record) is called as soon as each record is final, in completion order (streaming outputs).
+    """
+    stats = FetchStats()
+    records = [None] * len(links)
+    pending = list(range(len(links)))
+    emit = on_record or (lambda record: None)
+
+    if mode == MODE_TIERED:
+        own_session = session is None
+        session = session or make_session(workers)
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            async def http(i):
+                try:
+                    return i, await loop.run_in_executor(executor, _http_extract, session, links[i], extract)
+                except Exception as e:
+                    return i, e
+
+            pending = []
+            for done in asyncio.as_completed([http(i) for i in range(len(links))]):
+                i, result = await done
+                if isinstance(result, Exception):
+                    pending.append(i)
+                    continue
+                records[i] = result
+                if is_complete(result):
+                    stats.http += 1
+                    emit(result)
+                else:
+                    pending.append(i)
+        print(session.summary())
+        if own_session:
+            session.close()
+
+    if pending:
+        async def browser(i):
+            try:
+                return i, await pool.fetch(links[i])
+            except Exception as e:
+                return i, e
+
+        for done in asyncio.as_completed([browser(i) for i in sorted(pending)]):
+            i, page_html = await done
+            try:
+                if isinstance(page_html, Exception):
+                    raise page_html
+                records[i] = extract(page_html, links[i])
+                stats.browser += 1
+            except Exception as e:
+                print(f"Error extracting {links[i]}: {e}")
+                # keep the partial HTTP record if there is one
+                if records[i] is None:
+                    stats.errors += 1
+                else:
+                    stats.partial += 1
+            if records[i] is not None:
+                emit(records[i])
+
+    return records, stats
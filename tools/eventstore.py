@@ -0,0 +1,195 @@
+"""
+        //////////////////  EVENT STORE /////////////////////////////
+        SQLite system of record for every scraped event, keyed by (source, link).
+        Scrapers upsert each run; JSON / HTML outputs are views queried from here.
+
+        python tools/eventstore.py import OUTPUT_DIR/vg_manifs___*.json --source vide-greniers
+        python tools/eventstore.py query --day 2025-11-23 --area 92 --min-exposants 100
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import datetime, date
+from manif import Manif, FALLBACK_DATE
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.environ.get("VG_EVENT_STORE", os.path.join(REPO_DIR, ".cache", "events.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    source      TEXT NOT NULL,
+    link        TEXT NOT NULL,
+    titre       TEXT,
+    exposants   INTEGER,
+    adresse     TEXT,
+    ville       TEXT,
+    postal      TEXT,           -- 5-digit code found in adresse / ville
+    day         TEXT,           -- ISO date, NULL when the label could not be read
+    date_label  TEXT,           -- ManifDate as published ('Dimanche 23 Novembre 2025')
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    PRIMARY KEY (source, link)
+);
+CREATE INDEX IF NOT EXISTS events_day_exposants ON events (day, exposants);
+CREATE INDEX IF NOT EXISTS events_postal ON events (postal);
+CREATE INDEX IF NOT EXISTS events_ville ON events (ville);
+CREATE INDEX IF NOT EXISTS events_exposants ON events (exposants);
+CREATE INDEX IF NOT EXISTS events_last_seen ON events (source, last_seen);
+"""
+
+UPSERT = """
+INSERT INTO events (source, link, titre, exposants, adresse, ville, postal, day, date_label, first_seen, last_seen)
+VALUES (:source, :link, :titre, :exposants, :adresse, :ville, :postal, :day, :date_label, :seen, :seen)
+ON CONFLICT (source, link) DO UPDATE SET
+    titre = excluded.titre, exposants = excluded.exposants, adresse = excluded.adresse,
+    ville = excluded.ville, postal = excluded.postal, day = excluded.day, date_label = excluded.date_label,
+    first_seen = MIN(events.first_seen, excluded.first_seen),
+    last_seen = MAX(events.last_seen, excluded.last_seen)
+"""
+
+POSTAL_RE = re.compile(r"\b(\d{5})\b")
+
+
+def postal_of(*texts):
+    for text in texts:
+        m = POSTAL_RE.search(str(text or ""))
+        if m:
+            return m.group(1)
+    return None
+
+
+class EventStore:
+    """Thin wrapper around one SQLite file; usable as a context manager."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    # ----------------------------
+    # Write
+    # ----------------------------
+    def upsert(self, source, records, seen_at=None):
+        """records: Manif (or manif dicts, parsed once here). Returns the row count."""
+        seen = (seen_at or datetime.now()).isoformat(timespec="seconds")
+        rows = []
+        for r in records:
+            if isinstance(r, dict):
+                r = Manif.from_dict(r)
+            if not r or r.ManifLink in ("", "NA"):
+                continue
+            rows.append({
+                "source": source, "link": r.ManifLink, "titre": r.Titre,
+                "exposants": r.Exposants if isinstance(r.Exposants, int) else -1,
+                "adresse": r.Adresse, "ville": r.Ville,
+                "postal": postal_of(r.Ville, r.Adresse),
+                "day": r.day.isoformat() if r.day else None,
+                "date_label": r.ManifDate or FALLBACK_DATE, "seen": seen,
+            })
+        with self.db:
+            self.db.executemany(UPSERT, rows)
+        return len(rows)
+
+    def import_snapshot(self, path, source):
+        """One JSON output of a previous run ({date: [manif]} or {"events": {date: [manif]}})."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        grouped = data.get("events", data) if isinstance(data, dict) else {}
+        records = [m for group in grouped.values() if isinstance(group, list) for m in group if isinstance(m, dict)]
+        return self.upsert(source, records, seen_at=datetime.fromtimestamp(os.path.getmtime(path)))
+
+    # ----------------------------
+    # Read
+    # ----------------------------
+    def query(self, day=None, day_from=None, day_to=None, area=None, min_exposants=None,
+              source=None, seen_since=None, limit=None):
+        """
+        Events as Manif records, by day then biggest first (undated last).
+        day / day_from / day_to: ISO dates. area: postal code or prefix ('92', '75015'), else a
+        town name matched on ville. seen_since: only events listed by a run since that datetime.
+        """
+        where, args = [], []
+        if day:
+            where.append("day = ?"); args.append(str(day))
+        if day_from:
+            where.append("day >= ?"); args.append(str(day_from))
+        if day_to:
+            where.append("day <= ?"); args.append(str(day_to))
+        if area:
+            if str(area).isdigit():
+                where.append("postal GLOB ?"); args.append(f"{area}*")  # prefix GLOB can use the postal index
+            else:
+                where.append("ville LIKE ?"); args.append(f"%{area}%")
+        if min_exposants is not None:
+            where.append("exposants >= ?"); args.append(int(min_exposants))
+        if source:
+            where.append("source = ?"); args.append(source)
+        if seen_since:
+            where.append("last_seen >= ?"); args.append(seen_since.isoformat(timespec="seconds"))
+        sql = "SELECT * FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY day IS NULL, day, exposants DESC"  # undated last
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [self._record(row) for row in self.db.execute(sql, args)]
+
+    @staticmethod
+    def _record(row):
+        return Manif(
+            Titre=row["titre"], Exposants=row["exposants"], Adresse=row["adresse"],
+            Ville=row["ville"], ManifDate=row["date_label"], ManifLink=row["link"],
+            day=date.fromisoformat(row["day"]) if row["day"] else None,
+        )
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+# =================================================================
+# /////////////////// CLI
+# =================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SQLite store of scraped events.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="import JSON snapshots of previous runs")
+    imp.add_argument("files", nargs="+")
+    imp.add_argument("--source", required=True, help="e.g. vide-greniers, brocabrac")
+    q = sub.add_parser("query", help="events on a day / in an area / above an exposants count")
+    q.add_argument("--day"); q.add_argument("--from", dest="day_from"); q.add_argument("--to", dest="day_to")
+    q.add_argument("--area"); q.add_argument("--min-exposants", type=int); q.add_argument("--source")
+    q.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    with EventStore(args.db) as store:
+        if args.command == "import":
+            for path in args.files:
+                try:
+                    print(f"{path}: {store.import_snapshot(path, args.source)} events")
+                except (OSError, ValueError) as e:
+                    print(f"{path}: skipped ({e})", file=sys.stderr)
+            print(f"{store.count()} events in {args.db}")
+        else:
+            for m in store.query(args.day, args.day_from, args.day_to, args.area, args.min_exposants,
+                                 args.source, limit=args.limit):
+                print(f"{m.ManifDate} | {m.Exposants:>4} | {m.Ville} | {m.Titre} | {m.ManifLink}")
@@ -0,0 +1,177 @@
+"""
+        //////////////////  EVENT STREAM (NDJSON) /////////////////////////////
+        One JSON line per event, appended and flushed as soon as the event is
+        extracted, so other tools can start on the first events while the
+        crawl is still running (the final JSON / HTML outputs are unchanged).
+        The same file is the checkpoint of the run: a crashed or timed-out run
+        restarted on the same window resumes from the events already in it.
+
+        python tools/eventstream.py follow OUTPUT_DIR/vg_manifs.ndjson    # prints events as they arrive
+        python tools/eventstream.py cat .cache/skybroc_events.ndjson
+
+File: {"_run": <run key>} first, one line per event, {"_done": <event count>} when the
+run completed; follow() stops there. A reader meeting a half-written last line waits
+for the rest of it; a resumed writer drops it.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from manif import Manif
+
+RUN_KEY = "_run"
+DONE_KEY = "_done"
+POLL_SECONDS = 0.5
+
+
+def run_key(*parts):
+    """Identity of a scrape window (listing URLs, départements...): a checkpoint only resumes the same window."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class EventStream:
+    """
+    Appends Manif records (or plain dicts) as JSON lines; safe to share between threads.
+    resume=True and an unfinished stream of the same run_key: keeps its events (self.done,
+    {link: Manif}) and appends after them; otherwise a new stream is started.
+    """
+
+    def __init__(self, path, key=None, resume=False):
+        self.path = path
+        self.key = key
+        self.lock = threading.Lock()
+        self.done = self._checkpoint() if resume else {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.done:
+            self.file = open(path, "a", encoding="utf-8", newline="\n")
+            print(f"[stream] resuming {path}: {len(self.done)} events already scraped")
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="\n")  # a new run starts a new stream
+            self.file.write(json.dumps({RUN_KEY: key, "started": datetime.now().isoformat(timespec="seconds")}) + "\n")
+            self.file.flush()
+        self.count = len(self.done)
+
+    def _checkpoint(self):
+        """Events of an interrupted run of the same window; a half-written last line is cut off."""
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except OSError:
+            return {}
+        complete, tail = lines[:-1], lines[-1]
+        try:
+            header = json.loads(complete[0]) if complete else {}
+        except ValueError:
+            return {}
+        if header.get(RUN_KEY) != self.key:
+            return {}
+        done = {}
+        for raw in complete[1:]:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                return {}  # damaged in the middle: start over rather than guess
+            if DONE_KEY in record:
+                return {}  # that run finished: nothing to resume
+            done[record.get("ManifLink")] = Manif.from_dict(record)
+        if tail:
+            with open(self.path, "r+b") as f:
+                f.truncate(sum(len(line) + 1 for line in complete))
+        return done
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+    def write(self, manif):
+        record = manif if isinstance(manif, dict) else manif.to_dict()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()  # visible to readers right away
+            self.count += 1
+
+    def close(self, completed=True):
+        """completed=False (the run failed): no end marker, so the next run resumes from here."""
+        with self.lock:
+            if self.file.closed:
+                return
+            if completed:
+                self.file.write(json.dumps({DONE_KEY: self.count}) + "\n")
+            self.file.close()
+        if completed:
+            print(f"[stream] {self.count} events written to {self.path}")
+        else:
+            print(f"[stream] run interrupted: {self.count} events kept in {self.path} for the next run")
+
+
+def _parse(line):
+    """Manif for an event line, RUN_KEY for the header, None for the end marker."""
+    record = json.loads(line)
+    if DONE_KEY in record:
+        return None
+    return RUN_KEY if RUN_KEY in record else Manif.from_dict(record)
+
+def read_events(path):
+    """Events already in the file (a stream still being written is read up to its last full line)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            manif = _parse(line)
+            if manif is None:
+                break
+            if isinstance(manif, Manif):
+                yield manif
+
+def follow(path, poll=POLL_SECONDS, idle_timeout=None):
+    """
+    Yields events as the writer appends them, until its end marker; waits for the file to appear.
+    idle_timeout: seconds without a new line before giving up (None: wait for the end marker).
+    """
+    while not os.path.exists(path):
+        time.sleep(poll)
+    with open(path, "r", encoding="utf-8") as f:
+        partial, idle = "", 0.0
+        while True:
+            line = f.readline()
+            if not line:
+                if idle_timeout is not None and idle >= idle_timeout:
+                    return
+                time.sleep(poll)
+                idle += poll
+                continue
+            partial += line
+            if not partial.endswith("\n"):
+                continue  # the writer is in the middle of this line
+            line, partial, idle = partial, "", 0.0
+            manif = _parse(line)
+            if manif is None:
+                return
+            if isinstance(manif, Manif):
+                yield manif
+
+
+# =================================================================
+# /////////////////// CLI
+# =================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read an NDJSON event stream written by the scrapers.")
+    parser.add_argument("command", choices=["follow", "cat"])
+    parser.add_argument("path")
+    parser.add_argument("--idle-timeout", type=float, help="follow: stop after this many seconds without events")
+    args = parser.parse_args()
+
+    events = follow(args.path, idle_timeout=args.idle_timeout) if args.command == "follow" else read_events(args.path)
+    try:
+        for m in events:
+            print(f"{m.ManifDate} | {m.Exposants:>4} | {m.Ville} | {m.Titre} | {m.ManifLink}", flush=True)
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,85 @@
+"""
+        //////////////////  LOCAL GEOCODER /////////////////////////////
+        Stand-in for the BAN and Nominatim endpoints used by tools/geocode.py,
+        to try the geocoding stage offline and without hitting their limits:
+
+        python tools/fakegeocoder.py 8900
+        GEOCODER_URL=http://127.0.0.1:8900/search/csv/ python tools/geocode.py vg_manifs.json
+        GEOCODER=nominatim GEOCODER_URL=http://127.0.0.1:8900/search python tools/geocode.py vg_manifs.json
+
+Coordinates are derived from a hash of the address (stable, inside Île-de-France);
+addresses containing "introuvable" are not found. Every request is logged with the
+number of addresses it carried.
+"""
+
+import io
+import sys
+import csv
+import json
+import hashlib
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAT_RANGE = (48.45, 49.15)
+LON_RANGE = (1.75, 3.05)
+
+
+def fake_coords(query):
+    if "introuvable" in query.lower():
+        return None
+    h = hashlib.sha1(query.encode("utf-8")).digest()
+    lat = LAT_RANGE[0] + (LAT_RANGE[1] - LAT_RANGE[0]) * int.from_bytes(h[:4], "big") / 2**32
+    lon = LON_RANGE[0] + (LON_RANGE[1] - LON_RANGE[0]) * int.from_bytes(h[4:8], "big") / 2**32
+    return round(lat, 6), round(lon, 6)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """Nominatim: /search?q=...&format=json"""
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/search":
+            return self._reply(404)
+        query = parse_qs(url.query).get("q", [""])[0]
+        coords = fake_coords(query)
+        print("GET /search 1 address")
+        found = [{"lat": str(coords[0]), "lon": str(coords[1]), "display_name": query}] if coords else []
+        self._reply(200, json.dumps(found).encode())
+
+    def do_POST(self):
+        """BAN: multipart upload of a CSV ('data'), answered with the same rows + latitude/longitude/result_score."""
+        if urlsplit(self.path).path.rstrip("/") != "/search/csv":
+            return self._reply(404)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        head = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode()
+        message = BytesParser(policy=HTTP).parsebytes(head + body)
+        upload = next((part for part in message.iter_parts() if part.get_param("name", header="content-disposition") == "data"), None)
+        if upload is None:
+            return self._reply(400, b'{"error":"missing data file"}')
+        rows = list(csv.DictReader(io.StringIO(upload.get_payload(decode=True).decode("utf-8-sig"))))
+        print(f"POST /search/csv/ {len(rows)} addresses")
+        out = io.StringIO()
+        fields = (list(rows[0].keys()) if rows else ["q"]) + ["latitude", "longitude", "result_score"]
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            coords = fake_coords(row.get("q", ""))
+            writer.writerow({**row, "latitude": coords[0] if coords else "", "longitude": coords[1] if coords else "",
+                             "result_score": 0.9 if coords else ""})
+        self._reply(200, out.getvalue().encode("utf-8"), "text/csv; charset=utf-8")
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8900
+    print(f"Fake geocoder on http://127.0.0.1:{port}/search/csv/ (BAN) and /search (Nominatim)")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
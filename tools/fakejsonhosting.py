@@ -0,0 +1,72 @@
+"""
+        //////////////////  LOCAL JSONHOSTING /////////////////////////////
+        Stand-in for jsonhosting.com to try the publisher without spending the
+        100 requests/hour quota:
+
+        python tools/fakejsonhosting.py 8800
+        JSONHOSTING_BASE=http://127.0.0.1:8800/api/json python skyscra.py
+
+Implements GET/PATCH /api/json/<id> (X-Edit-Key checked) and POST /api/json,
+refuses documents above 1 MB, keeps everything in memory and logs each request
+with its payload size.
+"""
+
+import sys
+import json
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAX_BYTES = 1024 * 1024
+DOCS = {}  # id -> {"key": edit key, "body": bytes}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _doc_id(self):
+        parts = self.path.rstrip("/").split("/")
+        return parts[3] if len(parts) == 4 and parts[1:3] == ["api", "json"] else None
+
+    def _body(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        print(f"{self.command} {self.path} {len(body)} bytes")
+        return body
+
+    def do_GET(self):
+        doc = DOCS.get(self._doc_id())
+        self._reply(200, doc["body"]) if doc else self._reply(404)
+
+    def do_POST(self):
+        body = self._body()
+        if len(body) > MAX_BYTES:
+            return self._reply(413)
+        doc_id, key = uuid.uuid4().hex[:8], uuid.uuid4().hex
+        DOCS[doc_id] = {"key": key, "body": body}
+        self._reply(201, json.dumps({"id": doc_id, "editKey": key}).encode())
+
+    def do_PATCH(self):
+        doc_id = self._doc_id()
+        body = self._body()
+        if doc_id not in DOCS:
+            # the public index document exists beforehand on the real service
+            DOCS[doc_id] = {"key": self.headers.get("X-Edit-Key"), "body": b""}
+        if DOCS[doc_id]["key"] != self.headers.get("X-Edit-Key"):
+            return self._reply(403)
+        if len(body) > MAX_BYTES:
+            return self._reply(413)
+        DOCS[doc_id]["body"] = body
+        self._reply(200, b'{"ok":true}')
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8800
+    print(f"Fake jsonhosting on http://127.0.0.1:{port}/api/json")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
@@ -0,0 +1,89 @@
+"""
+        //////////////////  FRENCH DATES /////////////////////////////
+        One date parser for every scraper and tool: precompiled regexes and
+        lookup tables instead of per-call loops / str.replace chains / strptime
+        attempts, memoized because a run sees the same few dozen date strings
+        thousands of times.
+
+        parse_date("Samedi 15 novembre 2025")      -> date(2025, 11, 15)
+        parse_date("2025-11-15T08:00:00+01:00")    -> date(2025, 11, 15)   (ISO, JSON-LD startDate)
+        parse_date("15/11/2025")                    -> date(2025, 11, 15)
+        format_date_fr(date(2025, 11, 15))          -> "Samedi 15 Novembre 2025"
+
+python tools/bench_dates.py compares it with the parsers it replaced.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+FALLBACK_DATE = "01.01.0001"  # label of an event whose date could not be read
+CACHE_SIZE = 4096             # distinct date strings kept parsed (a run sees a few hundred)
+MIN_YEAR = 1900               # below: placeholders such as FALLBACK_DATE, not dates
+
+WEEKDAY_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+MONTH_FR = ["", "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+            "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
+
+# lookup tables: every spelling met on the sources (accents optional, abbreviations, English from the ISO-ish feeds)
+MONTHS = {
+    "janvier": 1, "janv": 1, "jan": 1, "février": 2, "fevrier": 2, "févr": 2, "fevr": 2, "fév": 2, "fev": 2,
+    "mars": 3, "mar": 3, "avril": 4, "avr": 4, "mai": 5, "juin": 6, "juillet": 7, "juil": 7,
+    "août": 8, "aout": 8, "septembre": 9, "sept": 9, "sep": 9, "octobre": 10, "oct": 10,
+    "novembre": 11, "nov": 11, "décembre": 12, "decembre": 12, "déc": 12, "dec": 12,
+    "january": 1, "february": 2, "feb": 2, "march": 3, "april": 4, "apr": 4, "may": 5, "june": 6, "jun": 6,
+    "july": 7, "jul": 7, "august": 8, "aug": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+_MONTH_ALT = "|".join(sorted(MONTHS, key=len, reverse=True))  # longest first: "juillet" before "juil"
+
+ISO_RE = re.compile(r"(\d{4})[-/](\d{1,2})[-/](\d{1,2})")          # 2025-11-15, 2025/11/15, ISO datetimes
+NUMERIC_RE = re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4})\b")  # 15/11/2025, 15.11.2025
+# "Samedi 15 novembre 2025", "1er déc. 2025", "15 Nov 2025": the weekday is not needed to read the date
+LABEL_RE = re.compile(rf"\b(\d{{1,2}})(?:er)?\s+({_MONTH_ALT})\b\.?\s+(\d{{4}})", flags=re.IGNORECASE)
+# a full label as the sites write it, kept verbatim by the scrapers ("Samedi 15 Novembre 2025")
+FR_DATE_RE = re.compile(r"(Lundi|Mardi|Mercredi|Jeudi|Vendredi|Samedi|Dimanche)\s+\d{1,2}\s+[A-Za-zÀ-ÿ]+\s+\d{4}", flags=re.IGNORECASE)
+
+
+def _make(year, month, day) -> Optional[date]:
+    if year < MIN_YEAR:
+        return None
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(text) -> Optional[date]:
+    """First date found in text (label, ISO / JSON-LD or dd/mm/yyyy), None when there is none."""
+    if not text or text == FALLBACK_DATE:
+        return None
+    m = LABEL_RE.search(text)
+    if m:
+        return _make(int(m.group(3)), MONTHS[m.group(2).lower()], int(m.group(1)))
+    m = ISO_RE.search(text)
+    if m:
+        return _make(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    m = NUMERIC_RE.search(text)
+    if m:
+        return _make(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+    return None
+
+
+def format_date_fr(d) -> str:
+    """date / datetime -> 'Dimanche 5 Octobre 2025' without touching the process locale; FALLBACK_DATE otherwise."""
+    if not isinstance(d, date):
+        return FALLBACK_DATE
+    return f"{WEEKDAY_FR[d.weekday()]} {d.day} {MONTH_FR[d.month]} {d.year}"
+
+
+def fr_date_in(text) -> str:
+    """First full French date label in text, as written; FALLBACK_DATE when there is none."""
+    m = FR_DATE_RE.search(text or "")
+    return m.group(0).strip() if m else FALLBACK_DATE
+
+
+def cache_info():
+    return parse_date.cache_info()
@@ -0,0 +1,272 @@
+"""
+        //////////////////  GEOCODING /////////////////////////////
+        Adds lat / lon to the scraped events once, in Python, instead of every
+        viewer asking Nominatim address by address on each page load.
+          - addresses normalized into a cache key (case, accents, spacing,
+            city repeated in the address)
+          - persistent cache (.cache/geocode.sqlite): hits and misses, misses
+            retried after MISS_RETRY_DAYS
+          - only unknown addresses go to the geocoder, deduplicated, in batches,
+            paced by a per-geocoder HostLimiter
+
+        python tools/geocode.py OUTPUT_DIR/vg_manifs.json          # adds lat/lon in place (JSON or NDJSON)
+        python tools/fakegeocoder.py 8900                           # local stand-in
+        GEOCODER_URL=http://127.0.0.1:8900/search/csv/ python tools/geocode.py vg_manifs.json
+
+Geocoders (GEOCODER): "ban" = Base Adresse Nationale CSV batch endpoint (French
+addresses, hundreds per request), "nominatim" = OpenStreetMap, one request per
+address at 1 req/s (their usage policy). Both only need .lookup_batch(queries).
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import json
+import sqlite3
+import argparse
+import unicodedata
+from datetime import datetime, timedelta
+import requests
+from ratelimit import HostLimiter
+from manif import Manif
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GEOCODER = os.environ.get("GEOCODER", "ban")  # "ban" | "nominatim"
+GEOCODER_URL = os.environ.get("GEOCODER_URL")  # overrides the geocoder's default endpoint (e.g. tools/fakegeocoder.py)
+CACHE_PATH = os.environ.get("VG_GEOCODE_CACHE", os.path.join(REPO_DIR, ".cache", "geocode.sqlite"))
+BAN_CSV_URL = "https://api-adresse.data.gouv.fr/search/csv/"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "vg-geocoder/1.0 (+https://github.com/h455en/vg)"  # Nominatim requires an identifying agent
+BATCH_SIZE = 500        # addresses per BAN CSV request
+MIN_SCORE = 0.4         # BAN result_score below this: treated as not found
+MISS_RETRY_DAYS = 30    # addresses not found are asked again after this
+TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    key        TEXT PRIMARY KEY,   -- normalize_address()
+    query      TEXT,               -- what was sent to the geocoder
+    lat        REAL,               -- NULL: not found
+    lon        REAL,
+    geocoder   TEXT,
+    looked_up  TEXT NOT NULL
+);
+"""
+
+# =================================================================
+# /////////////////// ADDRESSES
+# =================================================================
+PARIS_ARR_RE = re.compile(r"\bparis\s*(\d{1,2})(?:e|er|eme|ème)?\b", re.IGNORECASE)
+
+def _fold(text):
+    """lowercase, no accents, single spaces, no punctuation except commas."""
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode("ascii").lower()
+    text = re.sub(r"[^\w,]+", " ", text)
+    return re.sub(r"\s*,\s*", ", ", re.sub(r"\s+", " ", text)).strip(" ,")
+
+def normalize_address(adresse, ville):
+    """
+    (cache key, geocoder query) for an event; (None, None) without any address.
+    'Paris 15' -> '75015 Paris'; the town is not repeated when the address already ends with it.
+    """
+    parts = [p for p in (adresse, ville) if p and p != "NA"]
+    if not parts:
+        return None, None
+    parts = [PARIS_ARR_RE.sub(lambda m: f"750{int(m.group(1)):02d} Paris", p) for p in parts]
+    if len(parts) == 2 and _fold(parts[0]).endswith(_fold(parts[1])):
+        parts = parts[:1]
+    query = ", ".join(p.strip() for p in parts)
+    return _fold(query), query
+
+
+# =================================================================
+# /////////////////// CACHE
+# =================================================================
+class GeocodeCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def get_many(self, keys):
+        """{key: (lat, lon) or None} for the keys known and still fresh (recent misses count as known)."""
+        retry_before = (datetime.now() - timedelta(days=MISS_RETRY_DAYS)).isoformat(timespec="seconds")
+        known = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):  # SQLite host parameter limit
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for key, lat, lon, looked_up in self.db.execute(
+                    f"SELECT key, lat, lon, looked_up FROM geocode WHERE key IN ({marks})", chunk):
+                if lat is not None:
+                    known[key] = (lat, lon)
+                elif looked_up >= retry_before:
+                    known[key] = None
+        return known
+
+    def put_many(self, rows, geocoder):
+        """rows: [(key, query, (lat, lon) or None)]."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO geocode (key, query, lat, lon, geocoder, looked_up) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, query, *(coords or (None, None)), geocoder, now) for key, query, coords in rows])
+
+
+# =================================================================
+# /////////////////// GEOCODERS
+# =================================================================
+class BanGeocoder:
+    """Base Adresse Nationale: one CSV upload per batch."""
+    name = "ban"
+    batch_size = BATCH_SIZE
+
+    def __init__(self, url=None, limiter=None, session=None):
+        self.url = url or BAN_CSV_URL
+        self.limiter = limiter or HostLimiter(rate=5, burst=5, concurrency=1, max_concurrency=2)
+        self.session = session or requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def lookup_batch(self, queries):
+        """[(lat, lon) or None] in the order of queries."""
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["q"])
+        writer.writerows([q] for q in queries)
+        files = {"data": ("addresses.csv", buf.getvalue().encode("utf-8"), "text/csv")}
+        response = self.limiter.call(self.url, lambda: self.session.post(
+            self.url, files=files, data={"columns": "q"}, timeout=TIMEOUT))
+        response.raise_for_status()
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        results = []
+        for row in rows:
+            try:
+                found = float(row.get("result_score") or 0) >= MIN_SCORE
+                results.append((float(row["latitude"]), float(row["longitude"])) if found else None)
+            except (KeyError, TypeError, ValueError):
+                results.append(None)
+        if len(results) != len(queries):
+            raise ValueError(f"BAN returned {len(results)} rows for {len(queries)} addresses")
+        return results
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim: one address per request, 1 request per second."""
+    name = "nominatim"
+    batch_size = 20  # results cached every 20 lookups
+
+    def __init__(self, url=None, limiter=None, session=None):
+        self.url = url or NOMINATIM_URL
+        self.limiter = limiter or HostLimiter(rate=1, burst=1, concurrency=1, max_concurrency=1)
+        self.session = session or requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def lookup_batch(self, queries):
+        return [self.lookup(q) for q in queries]
+
+    def lookup(self, query):
+        params = {"q": query, "format": "json", "limit": 1, "countrycodes": "fr"}
+        response = self.limiter.call(self.url, lambda: self.session.get(self.url, params=params, timeout=TIMEOUT))
+        response.raise_for_status()
+        found = response.json()
+        return (float(found[0]["lat"]), float(found[0]["lon"])) if found else None
+
+
+GEOCODERS = {"ban": BanGeocoder, "nominatim": NominatimGeocoder}
+
+def make_geocoder(name=GEOCODER, url=GEOCODER_URL):
+    return GEOCODERS[name](url=url)
+
+
+# =================================================================
+# /////////////////// STAGE
+# =================================================================
+def geocode_manifs(manifs, geocoder=None, cache_path=CACHE_PATH):
+    """Sets lat / lon on every Manif whose address can be located; returns a one-line summary."""
+    by_key = {}
+    for m in manifs:
+        key, query = normalize_address(m.Adresse, m.Ville)
+        if key:
+            by_key.setdefault(key, (query, []))[1].append(m)
+
+    cache = GeocodeCache(cache_path)
+    try:
+        known = cache.get_many(by_key)
+        misses = [key for key in by_key if key not in known]
+        failed = 0
+        if misses:
+            geocoder = geocoder or make_geocoder()
+            for i in range(0, len(misses), geocoder.batch_size):
+                batch = misses[i:i + geocoder.batch_size]
+                try:
+                    found = geocoder.lookup_batch([by_key[key][0] for key in batch])
+                except (requests.RequestException, ValueError) as e:
+                    failed = len(misses) - i  # not cached: asked again next run
+                    print(f"❌ Geocoding failed: {e}")
+                    break
+                cache.put_many([(key, by_key[key][0], coords) for key, coords in zip(batch, found)], geocoder.name)
+                known.update(zip(batch, found))
+    finally:
+        cache.close()
+
+    located = 0
+    for key, (_, group) in by_key.items():
+        coords = known.get(key)
+        for m in group:
+            m.lat, m.lon = coords or (None, None)
+        located += len(group) if coords else 0
+    return (f"[geocode] {located}/{len(manifs)} events located, {len(by_key)} addresses: "
+            f"{len(by_key) - len(misses)} cached, {len(misses) - failed} looked up, {failed} failed")
+
+
+# =================================================================
+# /////////////////// CLI
+# =================================================================
+def _load(path):
+    """(manifs, writer) for a JSON output ({date: [..]} / {"events": {..}}) or an NDJSON stream."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".ndjson"):
+            lines = [json.loads(line) for line in f if line.strip()]
+            events = [Manif.from_dict(r) for r in lines if "ManifLink" in r]
+            it = iter(events)
+            def write(out):
+                for r in lines:
+                    out.write(json.dumps(next(it).to_dict() if "ManifLink" in r else r, ensure_ascii=False) + "\n")
+            return events, write
+        data = json.load(f)
+    grouped = data.get("events", data) if isinstance(data, dict) else {}
+    grouped_manifs = {label: [Manif.from_dict(e) for e in group] for label, group in grouped.items() if isinstance(group, list)}
+    def write(out):
+        result = {label: [m.to_dict() for m in group] for label, group in grouped_manifs.items()}
+        json.dump({**data, "events": result} if "events" in data else result, out, indent=2, ensure_ascii=False)
+    return [m for group in grouped_manifs.values() for m in group], write
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add lat/lon to scraped event files, through a persistent cache.")
+    parser.add_argument("files", nargs="+", help="JSON outputs or NDJSON streams, rewritten in place")
+    parser.add_argument("--geocoder", choices=sorted(GEOCODERS), default=GEOCODER)
+    parser.add_argument("--url", default=GEOCODER_URL, help="geocoder endpoint (e.g. tools/fakegeocoder.py)")
+    parser.add_argument("--cache", default=CACHE_PATH)
+    args = parser.parse_args()
+
+    geocoder = make_geocoder(args.geocoder, args.url)
+    for path in args.files:
+        try:
+            manifs, write = _load(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: skipped ({e})", file=sys.stderr)
+            continue
+        print(f"{path}: {geocode_manifs(manifs, geocoder, args.cache)}")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            write(out)
+        os.replace(tmp, path)
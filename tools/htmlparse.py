@@ -0,0 +1,65 @@
+"""
+        //////////////////  HTML PARSING /////////////////////////////
+        One place choosing the BeautifulSoup backend for every scraper
+        (VG_HTML_PARSER=html.parser|lxml|html5lib|auto, auto = best installed)
+        and building parse_only filters so a page only materializes the
+        tags a caller reads.
+"""
+
+import os
+from bs4 import BeautifulSoup
+
+try:
+    from bs4.filter import ElementFilter  # bs4 >= 4.13
+except ImportError:
+    ElementFilter = None
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+# html.parser until tools/bench_parsers.py and tools/check_extract.py have been run on
+# recorded pages with lxml (tree differences can change what the extractors read)
+PARSER = os.environ.get("VG_HTML_PARSER", "html.parser")
+BACKENDS = ("lxml", "html.parser", "html5lib")  # best first
+
+
+def available_backends():
+    """Installed BeautifulSoup tree builders, best first."""
+    found = []
+    for name in BACKENDS:
+        try:
+            BeautifulSoup("<p></p>", name)
+            found.append(name)
+        except Exception:  # bs4.FeatureNotFound
+            pass
+    return found
+
+def resolve_parser(name=PARSER):
+    return available_backends()[0] if name == "auto" else name
+
+PARSER_NAME = resolve_parser()
+
+
+def make_soup(markup, only=None, parser=None):
+    """BeautifulSoup on the configured backend; only = a filter from keep() (None: whole page)."""
+    return BeautifulSoup(markup, parser or PARSER_NAME, parse_only=only)
+
+def keep(names=(), with_attrs=(), strings=None):
+    """
+    parse_only filter keeping tags named `names` or carrying one of `with_attrs`, each with its
+    whole subtree, plus top-level strings accepted by strings(text) (e.g. a marker comment).
+    Document order is kept, so find_all_previous/next still work between kept nodes.
+    Returns None (= parse everything) on bs4 < 4.13, which cannot express this filter.
+    """
+    if ElementFilter is None:
+        return None
+    names, with_attrs = frozenset(names), tuple(with_attrs)
+
+    class _Keep(ElementFilter):
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return name in names or any(a in (attrs or {}) for a in with_attrs)
+
+        def allow_string_creation(self, string):
+            return bool(strings and strings(string))
+
+    return _Keep()
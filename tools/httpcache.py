@@ -0,0 +1,299 @@
+"""
+        //////////////////  HTTP CACHE /////////////////////////////
+        On-disk page cache shared by every scraper.
+        Bodies are stored once per content hash, the index is keyed by URL and keeps
+        ETag / Last-Modified so stale entries are revalidated with conditional GETs.
+"""
+
+import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+from collections import Counter
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from ratelimit import shared_limiter
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.environ.get("VG_CACHE_DIR", os.path.join(REPO_DIR, ".cache", "http"))
+DEFAULT_TTL = int(os.environ.get("VG_CACHE_TTL", 2 * 3600))         # served without any request
+DEFAULT_MAX_AGE = int(os.environ.get("VG_CACHE_MAX_AGE", 7 * 86400))  # evicted after this, even if valid
+DEFAULT_MAX_BYTES = int(os.environ.get("VG_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+ORPHAN_GRACE = 3600  # seconds: an unreferenced body older than this (before the index load) is a leftover
+
+
+class HttpCache:
+    """URL -> (validators, body hash) index plus a content-addressed object store."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._removed = set()  # URLs evicted here: not brought back from disk by save()
+        self._loaded_at = time.time()  # objects written after this may belong to another process
+        self._index = self._read_index()
+        atexit.register(self.save)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def lookup(self, url):
+        """Returns (entry, body) or (None, None) when the URL is not cached."""
+        with self._lock:
+            entry = self._index.get(url)
+        if not entry:
+            return None, None
+        try:
+            with open(self._object_path(entry["body"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None, None
+        with self._lock:
+            entry["used_at"] = time.time()
+            self._dirty = True
+        return entry, body
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    # ----------------------------
+    # Update
+    # ----------------------------
+    def store(self, url, body, headers):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        now = time.time()
+        entry = {
+            "body": digest,
+            "size": len(body),
+            "headers": {k: headers[k] for k in KEPT_HEADERS if k in headers},
+            "stored_at": now,
+            "used_at": now,
+        }
+        with self._lock:
+            self._index[url] = entry
+            self._dirty = True
+        return entry
+
+    def touch(self, url):
+        """A 304 answer: the cached body is valid for another TTL."""
+        with self._lock:
+            if url in self._index:
+                self._index[url]["stored_at"] = time.time()
+                self._dirty = True
+
+    # ----------------------------
+    # Eviction & persistence
+    # ----------------------------
+    def prune(self):
+        """
+        Drops entries older than max_age, then least recently used ones above max_bytes.
+        Bodies are deleted only when nothing references them anymore, neither here nor in the
+        index on disk (another scraper may share the directory); recent files and *.tmp files
+        being written are left alone.
+        """
+        now = time.time()
+        dropped = set()  # bodies of the entries evicted here
+        with self._lock:
+            for url in [u for u, e in self._index.items() if now - e["stored_at"] > self.max_age]:
+                dropped.add(self._index.pop(url)["body"])
+                self._removed.add(url)
+            refs = Counter(e["body"] for e in self._index.values())
+            sizes = {e["body"]: e["size"] for e in self._index.values()}
+            total = sum(sizes.values())
+            for url, e in sorted(self._index.items(), key=lambda kv: kv[1]["used_at"]):
+                if total <= self.max_bytes:
+                    break
+                del self._index[url]
+                self._removed.add(url)
+                dropped.add(e["body"])
+                refs[e["body"]] -= 1
+                if refs[e["body"]] == 0:
+                    total -= sizes.pop(e["body"])
+            live = set(sizes)
+            self._dirty = True
+            live |= {e["body"] for u, e in self._read_index().items() if u not in self._removed}
+        # evicted bodies, plus orphans well older than this index (left by an interrupted run;
+        # a younger one may be stored by a process that has not saved its index yet)
+        doomed = dropped - live
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "objects")):
+            for name in files:
+                path = os.path.join(root, name)
+                if name in live or name.endswith(".tmp"):
+                    continue
+                try:
+                    if name in doomed or os.path.getmtime(path) < self._loaded_at - ORPHAN_GRACE:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def save(self):
+        """
+        Writes the index merged with the one on disk: another process (or an older instance)
+        may have stored URLs since this one was loaded; the newest entry of each URL wins.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            for url, entry in self._read_index().items():
+                mine = self._index.get(url)
+                if url in self._removed or (mine and mine["stored_at"] >= entry["stored_at"]):
+                    continue
+                if os.path.exists(self._object_path(entry["body"])):  # its body may have been pruned here
+                    self._index[url] = entry
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self._index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self._index_path)
+            self._dirty = False
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """One HttpCache per directory for the whole process (every CachedSession on it shares the index)."""
+    key = os.path.abspath(cache_dir)
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = HttpCache(cache_dir)
+        return _shared[key]
+
+
+class CachedSession(requests.Session):
+    """
+    Drop-in requests.Session: plain GETs go through the HttpCache.
+    Fresh entries are returned without touching the network, stale ones are revalidated.
+    Every network request is paced (and retried when throttled) by a HostLimiter.
+    """
+
+    def __init__(self, cache=None, headers=None, limiter=None):
+        super().__init__()
+        self.cache = cache if cache is not None else shared_cache()
+        self.limiter = limiter if limiter is not None else shared_limiter()
+        if headers:
+            self.headers.update(headers)
+        self.hits = 0         # served from disk, no request
+        self.revalidated = 0  # 304 Not Modified
+        self.misses = 0       # full download
+
+    def _from_cache(self, url, entry, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def _send(self, method, url, *args, **kwargs):
+        return self.limiter.call(url, lambda: requests.Session.request(self, method, url, *args, **kwargs))
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != "GET" or kwargs.get("params") or kwargs.get("stream"):
+            return self._send(method, url, *args, **kwargs)
+
+        entry, body = self.cache.lookup(url)
+        if entry and self.cache.is_fresh(entry):
+            self.hits += 1
+            return self._from_cache(url, entry, body)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+        response = self._send(method, url, *args, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache.touch(url)
+            self.revalidated += 1
+            return self._from_cache(url, entry, body)
+        self.misses += 1
+        if response.status_code == 200:
+            self.cache.store(url, response.content, response.headers)
+        return response
+
+    def summary(self):
+        return (f"[cache] {self.hits} hits, {self.revalidated} revalidated, {self.misses} downloaded\n"
+                f"{self.limiter.summary()}")
+
+    def close(self):
+        self.cache.prune()
+        self.cache.save()
+        super().close()
+
+
+# ----------------------------
+# asyncio clients
+# ----------------------------
+async def cached_get_async(session, url, cache, stats=None, limiter=None, retry_exceptions=None):
+    """
+    aiohttp counterpart of CachedSession.get; returns the body bytes.
+    stats: optional object with hits / revalidated / misses counters (e.g. a CachedSession).
+    limiter: optional HostLimiter, entered only for the request itself (fresh hits cost no token).
+    """
+    entry, body = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        if stats:
+            stats.hits += 1
+        return body
+    headers = cache.conditional_headers(entry) if entry else {}
+
+    async def download():
+        async with session.get(url, headers=headers) as response:
+            if entry and response.status == 304:
+                return response, None
+            response.raise_for_status()
+            return response, await response.read()
+
+    if limiter is None:
+        response, content = await download()
+    else:
+        options = {"retry_exceptions": retry_exceptions} if retry_exceptions else {}
+        response, content = await limiter.call_async(url, download, **options)
+    if content is None:
+        cache.touch(url)
+        if stats:
+            stats.revalidated += 1
+        return body
+    if stats:
+        stats.misses += 1
+    cache.store(url, content, response.headers)
+    return content
@@ -0,0 +1,204 @@
+"""
+        //////////////////  JSON PUBLISHER /////////////////////////////
+        Publishes a grouped event feed ({date label: [event, ...]}) to jsonhosting.com
+        without re-sending everything each run:
+          - compact serialization: no whitespace, events as arrays whose column
+            order is fixed by SCHEMA_VERSION
+          - one document per month (split further above MAX_SHARD_BYTES)
+          - only shards whose content hash changed are uploaded; the index
+            document (the public URL, a few hundred bytes) is sent every run
+            so metadata.last_update tells when the feed was last checked
+
+        index  {"schema":3,"fields":[...],"metadata":{"last_update":..},"shards":[{"id","url","hash","count"}]}
+        shard  {"schema":3,"id":"2025-11","dates":{"Dimanche 23 Novembre 2025":[[Titre,Exposants,...],..]}}
+
+Shard documents are created on first use (POST) and their URL / edit key kept
+in a local state file, reused for other months once their month is gone.
+Losing that file (.cache/publish) orphans the shard documents: the next run
+creates new ones. Still opt-in (PUBLISH_MODE=sharded): the POST answer shape
+(id, editKey) is only known from tools/fakejsonhosting.py so far.
+"""
+
+import os
+import json
+import time
+import hashlib
+import requests
+from ratelimit import shared_limiter
+from frdates import parse_date
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+SCHEMA_VERSION = 3
+FIELDS = ["Titre", "Exposants", "Adresse", "Ville", "ManifLink", "lat", "lon", "dist_km"]  # ManifDate is the group key; lat/lon/dist_km null when not geocoded
+MAX_SHARD_BYTES = 900_000     # jsonhosting refuses documents above 1 MB
+CREATE_URL = "https://jsonhosting.com/api/json"
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.path.join(REPO_DIR, ".cache", "publish")  # kept between CI runs by actions/cache
+UNDATED = "undated"
+
+
+def compact(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+def month_of(date_label):
+    """'Dimanche 23 Novembre 2025' -> '2025-11' (UNDATED when it cannot be read)."""
+    d = parse_date(date_label)
+    return f"{d.year}-{d.month:02d}" if d else UNDATED
+
+def encode_event(event):
+    """Manif record (or plain dict) -> row in FIELDS order."""
+    if isinstance(event, dict):
+        return [event.get(k) for k in FIELDS]
+    return [getattr(event, k) for k in FIELDS]
+
+def decode_event(row, date_label):
+    """Inverse of encode_event (what the viewers do in JS)."""
+    event = dict(zip(FIELDS, row))
+    event["ManifDate"] = date_label
+    return event
+
+
+def build_shards(grouped, max_bytes=MAX_SHARD_BYTES):
+    """
+    grouped: {date label: [Manif, ...]} in display order.
+    Returns {shard id: {date label: [row, ...]}}; a month too big for one document
+    is split on date boundaries into '2025-11', '2025-11.2', ...
+    """
+    months = {}
+    for label, events in grouped.items():
+        months.setdefault(month_of(label), {})[label] = [encode_event(e) for e in events]
+
+    shards = {}
+    for month, dates in months.items():
+        part, size, n = {}, 0, 1
+        for label, rows in dates.items():
+            entry = len(compact({label: rows}).encode("utf-8"))
+            if part and size + entry > max_bytes:
+                shards[month if n == 1 else f"{month}.{n}"] = part
+                part, size, n = {}, 0, n + 1
+            part[label] = rows
+            size += entry
+        shards[month if n == 1 else f"{month}.{n}"] = part
+    return shards
+
+
+class PublishError(requests.RequestException):
+    """The service answered, but not with what the publisher needs (e.g. no edit key)."""
+
+
+class JsonPublisher:
+    """
+    index_url / edit_key: the public document (what the viewers load).
+    name: state file name, one per feed.
+    """
+
+    def __init__(self, index_url, edit_key, name, create_url=CREATE_URL, state_dir=STATE_DIR, timeout=15):
+        self.index_url = index_url
+        self.edit_key = edit_key
+        self.create_url = create_url
+        self.timeout = timeout
+        self.state_path = os.path.join(state_dir, f"{name}.json")
+        self.session = requests.Session()
+        self.limiter = shared_limiter()
+        self.uploads = 0
+        self.skipped = 0
+        self.state = {"shards": {}, "free": []}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+    def _send(self, method, url, payload, edit_key=None):
+        headers = {"Content-Type": "application/json"}
+        if edit_key:
+            headers["X-Edit-Key"] = edit_key
+        body = payload.encode("utf-8")
+        response = self.limiter.call(url, lambda: self.session.request(method, url, headers=headers, data=body,
+                                                                        timeout=self.timeout))
+        response.raise_for_status()
+        self.uploads += 1
+        return response
+
+    def _create(self, payload):
+        """New jsonhosting document -> (url, edit key)."""
+        answer = self._send("POST", self.create_url, payload).json()
+        doc_id = answer.get("id") or answer.get("_id")
+        key = answer.get("editKey") or answer.get("edit_key")
+        if not doc_id or not key:
+            # a document without its own edit key could never be PATCHed again
+            raise PublishError(f"create answered without an id / edit key: {sorted(answer)}")
+        url = answer.get("url") or f"{self.create_url.rstrip('/')}/{doc_id}"
+        return url, key
+
+    def _put_shard(self, shard_id, payload):
+        slot = self.state["shards"].get(shard_id)
+        recycled = slot is None and bool(self.state["free"])
+        if recycled:
+            slot = self.state["free"].pop()
+        if slot is None:
+            url, key = self._create(payload)
+            slot = {"url": url, "key": key}
+        else:
+            try:
+                self._send("PATCH", slot["url"], payload, slot["key"])
+            except requests.RequestException:
+                if recycled:
+                    self.state["free"].append(slot)  # still free: reused by the next run
+                raise
+        return slot
+
+    # ----------------------------
+    # Publish
+    # ----------------------------
+    def publish(self, grouped, metadata=None):
+        """Uploads the changed shards, then the index (always: it carries last_update). Returns True on success."""
+        shards = build_shards(grouped)
+        old = self.state["shards"]
+        new = {}
+        try:
+            for shard_id, dates in shards.items():
+                payload = compact({"schema": SCHEMA_VERSION, "id": shard_id, "dates": dates})
+                digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+                if shard_id in old and old[shard_id]["hash"] == digest:
+                    new[shard_id] = old[shard_id]
+                    self.skipped += 1
+                    continue
+                slot = self._put_shard(shard_id, payload)
+                new[shard_id] = {"url": slot["url"], "key": slot["key"], "hash": digest,
+                                 "count": sum(len(rows) for rows in dates.values())}
+                self.state["shards"][shard_id] = new[shard_id]  # kept even if a later upload fails
+
+            # months no longer listed: their documents are recycled for future months
+            for shard_id, slot in old.items():
+                if shard_id not in new:
+                    self.state["free"].append({"url": slot["url"], "key": slot["key"]})
+            self.state["shards"] = new
+
+            listing = [{"id": k, "url": v["url"], "hash": v["hash"], "count": v["count"]} for k, v in new.items()]
+            index = {"schema": SCHEMA_VERSION, "fields": FIELDS,
+                     "metadata": metadata or {"last_update": time.strftime("%d.%m.%Y %H:%M:%S")},
+                     "shards": listing}
+            self._send("PATCH", self.index_url, compact(index), self.edit_key)
+            return True
+        except requests.RequestException as e:
+            print(f"❌ Publish failed: {e}")
+            return False
+        finally:
+            self.save()
+            print(self.summary(len(shards)))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def summary(self, shard_count):
+        return f"[publish] {shard_count} shards, {self.skipped} unchanged, {self.uploads} uploads"
@@ -0,0 +1,83 @@
+"""
+        //////////////////  MANIF RECORD /////////////////////////////
+        The event record shared by scra, skyscra, skybroc and the tools.
+        Slotted (no per-instance __dict__), with the day parsed once into a
+        real date next to the display label, so grouping and sorting never
+        parse date strings again.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from frdates import FALLBACK_DATE, parse_date
+
+PUBLIC_FIELDS = ("Titre", "Exposants", "Adresse", "Ville", "ManifDate", "ManifLink")  # the JSON shape
+
+
+@dataclass(slots=True)
+class Manif:
+    """One event. ManifDate is the label shown to users, day the same date as a date (None: unknown)."""
+    Titre: str = "NA"
+    Exposants: int = -1
+    Adresse: str = "NA"
+    Ville: str = "NA"
+    ManifDate: str = FALLBACK_DATE
+    ManifLink: str = "NA"
+    day: Optional[date] = None
+    lat: Optional[float] = None  # filled by geocoding, when known
+    lon: Optional[float] = None
+    dist_km: Optional[float] = None  # from HOME (tools/spatial.py), when geocoded
+
+    @classmethod
+    def parsed(cls, **fields):
+        """Builds a record from scraped fields, parsing the ManifDate label once."""
+        manif = cls(**fields)
+        if manif.day is None:
+            manif.day = parse_date(manif.ManifDate)
+        return manif
+
+    def is_complete(self) -> bool:
+        # anything missing here is usually rendered by Alpine.js -> retry through the browser
+        return self.ManifDate != FALLBACK_DATE and self.Exposants != -1 and self.Adresse not in ("", "NA")
+
+    def sort_key(self):
+        """Undated last, then by day, biggest first."""
+        return (self.day is None, self.day or date.min, -self.Exposants)
+
+    # ----------------------------
+    # JSON
+    # ----------------------------
+    def to_dict(self) -> dict:
+        """JSON shape of the outputs, plus the ISO day so decoding needs no parsing."""
+        d = {"Titre": self.Titre, "Exposants": self.Exposants, "Adresse": self.Adresse, "Ville": self.Ville,
+             "ManifDate": self.ManifDate, "ManifLink": self.ManifLink,
+             "day": self.day.isoformat() if self.day else None}
+        if self.lat is not None:
+            d["lat"], d["lon"] = self.lat, self.lon
+        if self.dist_km is not None:
+            d["dist_km"] = self.dist_km
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        """Inverse of to_dict; older JSON without 'day' gets its label parsed once."""
+        iso = d.get("day")
+        return cls(
+            Titre=d.get("Titre", "NA"), Exposants=d.get("Exposants", -1), Adresse=d.get("Adresse", "NA"),
+            Ville=d.get("Ville", "NA"), ManifDate=d.get("ManifDate", FALLBACK_DATE), ManifLink=d.get("ManifLink", "NA"),
+            day=date.fromisoformat(iso) if iso else parse_date(d.get("ManifDate")),
+            lat=d.get("lat"), lon=d.get("lon"), dist_km=d.get("dist_km"),
+        )
+
+
+def group_by_day(manifs, newest_first=False):
+    """{ManifDate label: [Manif, ...]} ordered by day (undated last), biggest events first in each group."""
+    ordered = sorted(manifs, key=Manif.sort_key)
+    if newest_first:
+        dated = [m for m in ordered if m.day is not None]
+        dated.sort(key=lambda m: m.day, reverse=True)  # stable: keeps exposants order within a day
+        ordered = dated + [m for m in ordered if m.day is None]
+    grouped = {}
+    for m in ordered:
+        grouped.setdefault(m.ManifDate, []).append(m)
+    return grouped
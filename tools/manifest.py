@@ -0,0 +1,99 @@
+"""
+        //////////////////  SCRAPE MANIFEST /////////////////////////////
+        Remembers every event link already scraped so a run only re-extracts
+        links that are new, due for a refresh, or whose listing card changed.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+DEFAULT_REFRESH_HOURS = 72  # an unchanged event is re-extracted at least this often
+
+
+def content_hash(value) -> str:
+    """Stable short hash of a string or JSON-serializable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+def listing_card(anchor, is_event_href):
+    """
+    Largest ancestor of an event anchor that still holds a single event: its text is
+    what the listing shows for that event (title, date, town, exposants...).
+    """
+    href = anchor["href"]
+    card = anchor
+    while card.parent is not None and card.parent.name not in ("body", "[document]"):
+        hrefs = {a["href"] for a in card.parent.find_all("a", href=True) if is_event_href(a["href"])}
+        if hrefs != {href}:
+            break
+        card = card.parent
+    return card.get_text(" ", strip=True)
+
+
+class ScrapeManifest:
+    """JSON file: ManifLink -> {card hash, fields hash, fetched_at, record}."""
+
+    def __init__(self, path, refresh_hours=DEFAULT_REFRESH_HOURS):
+        self.path = path
+        self.refresh = timedelta(hours=refresh_hours)
+        self.entries = {}
+        self.new = self.changed = self.unchanged = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def plan(self, cards: dict, now=None):
+        """
+        cards: ManifLink -> listing card text, in listing order.
+        Returns (links to fetch, {link: record} reused as-is from the manifest).
+        """
+        now = now or datetime.now()
+        to_fetch, reused = [], {}
+        for link, card in cards.items():
+            entry = self.entries.get(link)
+            if (entry is None
+                    or entry["card"] != content_hash(card)
+                    or now - datetime.fromisoformat(entry["fetched_at"]) > self.refresh):
+                to_fetch.append(link)
+            else:
+                reused[link] = entry["record"]
+        return to_fetch, reused
+
+    def update(self, link, card, record, now=None):
+        fields = content_hash(record)
+        previous = self.entries.get(link)
+        if previous is None:
+            self.new += 1
+        elif previous["fields"] != fields:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+        self.entries[link] = {
+            "card": content_hash(card),
+            "fields": fields,
+            "fetched_at": (now or datetime.now()).isoformat(timespec="seconds"),
+            "record": record,
+        }
+
+    def save(self, listed_links=None):
+        """Writes the manifest; links no longer on the listing are forgotten."""
+        if listed_links is not None:
+            listed = set(listed_links)
+            self.entries = {k: v for k, v in self.entries.items() if k in listed}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def summary(self, reused_count):
+        return (f"[manifest] {reused_count} reused, {self.new} new, "
+                f"{self.changed} changed, {self.unchanged} re-checked unchanged")
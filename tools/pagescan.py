@@ -0,0 +1,88 @@
+"""
+        //////////////////  PAGE SCAN /////////////////////////////
+        One walk over an event page collecting every node the field extractors
+        look up (h1/h2, <time>, JSON-LD, location section, "Adresse" label),
+        plus the page text computed once and shared by all regex fallbacks.
+"""
+
+import re
+from bs4 import BeautifulSoup
+from htmlparse import make_soup
+from frdates import FALLBACK_DATE, FR_DATE_RE, parse_date, format_date_fr
+
+ADRESSE_RE = re.compile(r"Adresse", flags=re.IGNORECASE)
+EXPOSANTS_RE = re.compile(r"(\d+)\s*exposants", flags=re.IGNORECASE)
+FIRST_TAGS = ("h1", "h2", "time")  # only the first one of each is read
+
+
+class PageScan:
+    """Same lookups as soup.find(...) / find_all(...), answered from a single traversal."""
+
+    __slots__ = ("soup", "first", "ld_json", "location_section", "adresse_node", "_text")
+
+    def __init__(self, soup):
+        if not isinstance(soup, BeautifulSoup):
+            soup = make_soup(soup)
+        self.soup = soup
+        self.first = {}             # tag name -> first element in document order
+        self.ld_json = []           # <script type="application/ld+json"> elements
+        self.location_section = None  # <section x-ref="locationSection">
+        self.adresse_node = None    # first string mentioning "Adresse"
+        self._text = None
+
+        first = self.first
+        for node in soup.descendants:
+            name = node.name
+            if name is None:  # NavigableString (text, comment, script body...)
+                if self.adresse_node is None and ADRESSE_RE.search(node):
+                    self.adresse_node = node
+            elif name in FIRST_TAGS:
+                first.setdefault(name, node)
+            elif name == "script":
+                if node.get("type") == "application/ld+json":
+                    self.ld_json.append(node)
+            elif name == "section" and self.location_section is None and node.get("x-ref") == "locationSection":
+                self.location_section = node
+
+    @property
+    def text(self):
+        """soup.get_text(" ", strip=True), computed on first use only."""
+        if self._text is None:
+            self._text = self.soup.get_text(" ", strip=True)
+        return self._text
+
+
+# =================================================================
+# /////////////////// FIELDS
+# =================================================================
+# shared by scra.py and skyscra.py, fed either by PageScan or by soup.find(...)
+def title_from(h1, find_h2):
+    """Text of the first h1, else of the first h2 (find_h2() only called when needed); "NA" otherwise."""
+    if h1 and h1.get_text(strip=True):
+        return h1.get_text(" ", strip=True)
+    h2 = find_h2()
+    if h2 and h2.get_text(strip=True):
+        return h2.get_text(" ", strip=True)
+    return "NA"
+
+def exposants_in(text):
+    m = EXPOSANTS_RE.search(text)
+    return int(m.group(1)) if m else -1
+
+def date_from_time(time_tag):
+    """Label of a <time> element: French label as written, else its datetime / text parsed; FALLBACK_DATE."""
+    if not time_tag:
+        return FALLBACK_DATE
+    text = time_tag.get_text(" ", strip=True)
+    m = FR_DATE_RE.search(text)
+    if m:
+        return m.group(0).strip()
+    d = parse_date(time_tag.get("datetime") or text)
+    return format_date_fr(d) if d else FALLBACK_DATE
+
+def ville_from_address(address):
+    """Last comma separated part of a cleaned address (zip + city); "NA" when there is none."""
+    if not address or address == "NA":
+        return "NA"
+    parts = [p.strip() for p in address.split(",") if p.strip()]
+    return parts[-1] if parts else "NA"
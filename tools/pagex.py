@@ -1,5 +1,3 @@
-import requests
-from bs4 import BeautifulSoup
 import random
 import html
 from collections import defaultdict
@@ -7,11 +5,14 @@ import re
 import argparse
 from pathlib import Path
 import sys
+from httpcache import CachedSession
+from htmlparse import make_soup
 
 # --- Configuration ---
 # Bootstrap Color Classes for Tags
 COLORS = ["bg-primary", "bg-success", "bg-info", "bg-warning", "bg-danger", "bg-secondary", "bg-dark"]
 tag_colors = {}
+SESSION = CachedSession()  # articles rarely change: revalidated instead of re-downloaded
 
 def get_tag_color(tag):
     """Assigns a consistent color class to each unique tag."""
@@ -26,9 +27,9 @@ def extract_article(url):
     """
     try:
         print(f"Processing: {url}")
-        r = requests.get(url, timeout=15)
+        r = SESSION.get(url, timeout=15)
         r.encoding = 'utf-8'
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = make_soup(r.text)
 
         # 1. Find the main content div
         selectors = [
@@ -440,6 +441,8 @@ def main():
 
     # 3. Extract Articles
     articles = [extract_article(u) for u in urls]
+    print(SESSION.summary())
+    SESSION.close()
 
     # 4. Prepare HTML parts
     tag_counts = defaultdict(int)
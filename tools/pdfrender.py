@@ -0,0 +1,39 @@
+"""
+        //////////////////  PDF RENDERING /////////////////////////////
+        Page and image rasterization shared by router.py and xtractImg.py:
+        only the strip kept by crop_edges is rendered, straight into PIL.
+        Each script passes its own CROP_* / PAGE_* settings.
+"""
+
+import fitz
+from PIL import Image
+
+
+def pixmap_to_pil(pix):
+    """
+    PIL image straight from the pixmap samples: no temp PNG, no encode / decode round-trip.
+    pix.samples (one copy) rather than samples_mv: the image must outlive the pixmap.
+    """
+    if pix.colorspace is not None and pix.colorspace.n not in (1, 3):  # CMYK, Lab...
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    gray = pix.colorspace is None or pix.colorspace.n == 1
+    mode = ("LA" if gray else "RGBA") if pix.alpha else ("L" if gray else "RGB")
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+
+def page_clip(page, keep_left_percent, keep_right_percent):
+    """The strip crop_edges keeps, in PDF coordinates (same bounds), so only that part is rasterized."""
+    r = page.rect
+    left = r.width * keep_left_percent / 100
+    right = r.width - r.width * keep_right_percent / 100
+    if right <= left:
+        center = r.width / 2
+        keep_each_side = min(keep_left_percent, keep_right_percent) / 100 * r.width / 2
+        left, right = center - keep_each_side, center + keep_each_side
+    return fitz.Rect(r.x0 + left, r.y0, r.x0 + right, r.y1)
+
+def render_page(page, keep_left_percent, keep_right_percent, dpi=150, width_px=None, max_dpi=300):
+    """Kept strip of the page, width_px wide (or at dpi), never above max_dpi."""
+    clip = page_clip(page, keep_left_percent, keep_right_percent)
+    zoom = width_px / clip.width if width_px else dpi / 72
+    zoom = min(zoom, max_dpi / 72)
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
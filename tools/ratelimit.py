@@ -0,0 +1,266 @@
+"""
+        //////////////////  RATE LIMITER /////////////////////////////
+        Polite pacing shared by every fetcher (requests, aiohttp, Playwright):
+          - per-host token bucket instead of fixed sleeps
+          - Retry-After honoured on 429/503, exponential backoff with jitter otherwise
+          - AIMD concurrency: +1 slot per window of fast answers, halved on
+            throttling, errors or slow answers
+"""
+
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+DEFAULT_RATE = 5.0          # requests per second, per host (starting point)
+DEFAULT_BURST = 10          # requests allowed back to back after an idle period
+MIN_RATE, MAX_RATE = 0.5, 20.0
+START_CONCURRENCY = 4       # parallel requests per host (starting point)
+MAX_CONCURRENCY = 16
+TARGET_LATENCY = 2.0        # seconds; slower answers count as a congestion signal
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0          # seconds, doubled on every retry
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+class HttpStatusError(Exception):
+    """Raised by fetchers whose client has no response object to hand back (Playwright, aiohttp)."""
+
+    def __init__(self, status, headers=None, url=""):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.headers = headers or {}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; a caller reserves a token and is told how long to wait for it."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token (possibly in advance) and returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) -> seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, retry_after=None):
+    """Retry-After when the server gave one, else exponential backoff with full jitter."""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 1)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class HostState:
+    """Bucket, AIMD concurrency window and pause of one host."""
+
+    def __init__(self, rate, burst, concurrency, max_concurrency):
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = float(concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.cond = threading.Condition()
+
+    def _can_start(self):
+        return self.in_flight < int(self.limit) and time.monotonic() >= self.blocked_until
+
+    def try_start(self):
+        with self.cond:
+            if self._can_start():
+                self.in_flight += 1
+                return True
+            return False
+
+    def start(self):
+        with self.cond:
+            while not self._can_start():
+                self.cond.wait(timeout=max(0.05, self.blocked_until - time.monotonic()))
+            self.in_flight += 1
+
+    def finish(self, ok, latency, throttled=False, retry_after=None):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled or not ok or latency > TARGET_LATENCY:
+                # multiplicative decrease of both the window and the token rate
+                self.limit = max(1.0, self.limit / 2)
+                self.bucket.rate = max(MIN_RATE, self.bucket.rate / 2)
+            else:
+                # additive increase: about +1 slot once a full window succeeded
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.bucket.rate = min(MAX_RATE, self.bucket.rate + 0.1)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            self.cond.notify_all()
+
+    def release(self):
+        """Frees the slot of a request that was abandoned (cancelled): no verdict on the host."""
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+
+class HostLimiter:
+    """
+    One HostState per host, created on first use.
+    call()/call_async() run a request under the host's limits and retry it when throttled.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, concurrency=START_CONCURRENCY,
+                 max_concurrency=MAX_CONCURRENCY, max_retries=MAX_RETRIES, per_host=None):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.per_host = per_host or {}  # host -> (rate, burst) overrides
+        self.retries = 0                # requests replayed during this run
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url) -> HostState:
+        name = urlsplit(url).hostname or url
+        with self._lock:
+            if name not in self._hosts:
+                rate, burst = self.per_host.get(name, (self.rate, self.burst))
+                self._hosts[name] = HostState(rate, burst, min(self.concurrency, self.max_concurrency), self.max_concurrency)
+            return self._hosts[name]
+
+    def bucket(self, url) -> TokenBucket:
+        return self.host(url).bucket
+
+    def wait(self, url):
+        self.bucket(url).acquire()
+
+    async def wait_async(self, url):
+        await self.bucket(url).acquire_async()
+
+    @staticmethod
+    def _outcome(result=None, error=None):
+        """(status, retry_after) of a response object or of an exception carrying one."""
+        source = result if error is None else error
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        headers = getattr(source, "headers", None) or {}
+        # Playwright lower-cases header names, requests/aiohttp look them up case-insensitively
+        return status, parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+
+    def _settle(self, state, started, status, retry_after, failed, timed=True):
+        throttled = status in THROTTLE_STATUSES
+        latency = time.monotonic() - started if timed else 0.0
+        state.finish(ok=not failed and status not in RETRY_STATUSES, latency=latency,
+                     throttled=throttled, retry_after=retry_after if throttled else None)
+        return status in RETRY_STATUSES or failed
+
+    def call(self, url, fn, retry_exceptions=(OSError,)):
+        """fn() performs one request and returns a response (with .status_code or .status)."""
+        state = self.host(url)
+        for attempt in range(self.max_retries + 1):
+            state.start()
+            state.bucket.acquire()
+            started = time.monotonic()
+            try:
+                result = fn()
+            except retry_exceptions as e:
+                status, retry_after = self._outcome(error=e)
+                self._settle(state, started, status, retry_after, failed=True)
+                if attempt == self.max_retries:
+                    raise
+            except Exception:
+                self._settle(state, started, None, None, failed=True)  # not retried, still a failure
+                raise
+            except BaseException:
+                state.release()  # interrupted: the host did nothing wrong
+                raise
+            else:
+                status, retry_after = self._outcome(result)
+                if not self._settle(state, started, status, retry_after, failed=False) or attempt == self.max_retries:
+                    return result
+            self.retries += 1
+            time.sleep(backoff_delay(attempt, retry_after))
+
+    async def call_async(self, url, afn, retry_exceptions=(OSError, asyncio.TimeoutError, HttpStatusError), timed=True):
+        """
+        afn() is a coroutine function doing one request; HttpStatusError-like errors carry .status/.headers.
+        timed=False: afn's duration is not a congestion signal (a browser load is slow by nature),
+        only throttling and errors shrink the window.
+        """
+        state = self.host(url)
+        for attempt in range(self.max_retries + 1):
+            while not state.try_start():
+                await asyncio.sleep(0.05)
+            await state.bucket.acquire_async()
+            started = time.monotonic()
+            try:
+                result = await afn()
+            except retry_exceptions as e:
+                status, retry_after = self._outcome(error=e)
+                retryable = self._settle(state, started, status, retry_after, failed=status is None or status in RETRY_STATUSES,
+                                         timed=timed)
+                if not retryable or attempt == self.max_retries:
+                    raise
+            except Exception:
+                self._settle(state, started, None, None, failed=True, timed=timed)
+                raise
+            except BaseException:
+                state.release()  # cancelled (asyncio.CancelledError): no verdict on the host
+                raise
+            else:
+                status, retry_after = self._outcome(result)
+                if not self._settle(state, started, status, retry_after, failed=False, timed=timed) or attempt == self.max_retries:
+                    return result
+            self.retries += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    def summary(self):
+        hosts = ", ".join(f"{name}: {s.limit:.1f} slots @ {s.bucket.rate:.1f} req/s" for name, s in self._hosts.items())
+        return f"[limiter] {self.retries} retries; {hosts or 'no requests'}"
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_limiter() -> HostLimiter:
+    """Process-wide limiter, so HTTP sessions and the browser pool pace a host together."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostLimiter()
+        return _shared
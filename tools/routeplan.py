@@ -0,0 +1,283 @@
+"""
+        //////////////////  ROUTE PLANNER /////////////////////////////
+        Picks and orders the manifs of one day for a time budget, instead of
+        hand-picking them in EventsViewer.html and letting Google Maps order
+        the stops (RoutePlan.html):
+          - candidates: geocoded events of the day reachable from the start
+            and back within the budget (tools/spatial.py index)
+          - value of a stop = its exposants; each stop costs VISIT_MIN
+          - greedy insertion (best value per added minute), then 2-opt,
+            Or-opt, insertion and swap moves until nothing improves
+          - travel times estimated from the coordinates (no network), each
+            row computed once and kept for the whole search
+
+        python tools/routeplan.py OUTPUT_DIR/vg_manifs.json --date 2025-11-15 --budget 300
+        python tools/routeplan.py --store --date 2025-11-15 --start 48.80,2.13
+        python tools/routeplan.py --bench 500
+
+Output: ordered stops with arrival times, collected exposants, and a Google Maps
+directions URL (at most MAX_STOPS stops: what a maps/dir link takes).
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List
+from urllib.parse import quote
+from manif import Manif
+from frdates import parse_date, format_date_fr
+from spatial import HOME, KM_PER_DEG_LAT, SpatialIndex, load_manifs
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+BUDGET_MIN = 300        # whole outing, travel + visits
+VISIT_MIN = 30          # time spent at each manif
+SPEED_KMH = 40          # average door-to-door speed by car around Paris
+DETOUR = 1.35           # road distance / straight-line distance
+MAX_STOPS = 9           # Google Maps directions links take 9 waypoints
+MAX_CANDIDATES = 500    # best value per km kept when more are reachable
+UNKNOWN_VALUE = 50      # value of an event whose exposants count is unknown
+DEPART = "08:00"
+MAPS_DIR_URL = "https://www.google.com/maps/dir/"
+
+
+# =================================================================
+# /////////////////// TRAVEL TIMES
+# =================================================================
+class TravelTimes:
+    """
+    Minutes between points (lat, lon): straight line on a local projection, x DETOUR, at SPEED_KMH.
+    Symmetric; a row is computed the first time a point is on the route and then reused, so
+    the search only ever pays for rows of points it actually routes through.
+    """
+
+    def __init__(self, points, speed_kmh=SPEED_KMH, detour=DETOUR):
+        mean_lat = sum(lat for lat, _ in points) / max(len(points), 1)
+        kx = KM_PER_DEG_LAT * math.cos(math.radians(mean_lat))
+        self.xy = [(lon * kx, lat * KM_PER_DEG_LAT) for lat, lon in points]
+        self.factor = detour / speed_kmh * 60
+        self.rows = {}
+
+    def row(self, i):
+        r = self.rows.get(i)
+        if r is None:
+            x0, y0 = self.xy[i]
+            f = self.factor
+            r = self.rows[i] = [math.hypot(x - x0, y - y0) * f for x, y in self.xy]
+        return r
+
+    def route_minutes(self, route):
+        """Travel only, along route (list of point indices)."""
+        return sum(self.row(a)[b] for a, b in zip(route, route[1:]))
+
+
+# =================================================================
+# /////////////////// PLAN
+# =================================================================
+@dataclass
+class Plan:
+    start: tuple
+    end: tuple
+    stops: List[Manif] = field(default_factory=list)
+    arrivals: List[datetime] = field(default_factory=list)
+    travel_min: float = 0.0
+    total_min: float = 0.0
+    value: int = 0
+    candidates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def maps_url(self):
+        points = [self.start] + [(m.lat, m.lon) for m in self.stops] + [self.end]
+        return MAPS_DIR_URL + "/".join(quote(f"{lat:.6f},{lon:.6f}") for lat, lon in points) + "?travelmode=driving"
+
+    def describe(self):
+        lines = [f"{len(self.stops)} stops, {self.value} exposants, {self.total_min:.0f} min "
+                 f"({self.travel_min:.0f} on the road), chosen among {self.candidates} in {1000 * self.seconds:.0f} ms"]
+        for at, m in zip(self.arrivals, self.stops):
+            dist = f"{m.dist_km:5.1f} km" if m.dist_km is not None else "        "
+            lines.append(f"  {at:%H:%M} | {m.Exposants:>4} | {dist} | {m.Ville} | {m.Titre} | {m.ManifLink}")
+        lines.append(self.maps_url)
+        return "\n".join(lines)
+
+
+def value_of(m: Manif) -> int:
+    return m.Exposants if m.Exposants and m.Exposants > 0 else UNKNOWN_VALUE
+
+
+def _cost(tt, route):
+    """Travel + visits of a route [start, stops..., end]."""
+    return tt.route_minutes(route) + VISIT_MIN * (len(route) - 2)
+
+
+def _best_insertion(tt, route, pool, value, budget, used):
+    """(candidate, position, added minutes) with the best value per added minute that fits, or None."""
+    best, best_score = None, 0.0
+    for c in pool:
+        for p in range(len(route) - 1):
+            a, b = route[p], route[p + 1]
+            ra = tt.row(a)
+            added = ra[c] + tt.row(b)[c] - ra[b] + VISIT_MIN  # only rows of route points
+            if used + added <= budget and value[c] / added > best_score:
+                best, best_score = (c, p + 1, added), value[c] / added
+    return best
+
+
+def _two_opt(tt, route):
+    """Reverses stop segments while it shortens the route."""
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            for j in range(i + 1, len(route) - 1):
+                a, b, c, d = route[i - 1], route[i], route[j], route[j + 1]
+                if tt.row(a)[c] + tt.row(b)[d] < tt.row(a)[b] + tt.row(c)[d] - 1e-9:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    return route
+
+
+def _or_opt(tt, route):
+    """Moves segments of 1 to 3 stops (either way round) elsewhere while it shortens the route."""
+    improved = True
+    while improved:
+        improved = False
+        current = tt.route_minutes(route)
+        for length in (1, 2, 3):
+            for i in range(1, len(route) - length):
+                segment, rest = route[i:i + length], route[:i] + route[i + length:]
+                for p in range(1, len(rest)):
+                    if p == i:
+                        continue
+                    for seg in (segment, segment[::-1]):
+                        candidate = rest[:p] + seg + rest[p:]
+                        minutes = tt.route_minutes(candidate)
+                        if minutes < current - 1e-9:
+                            route[:], current, improved = candidate, minutes, True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return route
+
+
+def _swap(tt, route, pool, value, budget):
+    """Replaces a stop by a more valuable unvisited candidate when the budget allows; True if one was made."""
+    used = _cost(tt, route)
+    for i in range(1, len(route) - 1):
+        a, s, b = route[i - 1], route[i], route[i + 1]
+        ra, rb = tt.row(a), tt.row(b)
+        freed = ra[s] + rb[s] - ra[b]
+        best = None
+        for c in pool:
+            if value[c] > value[s] and used - freed + ra[c] + rb[c] - ra[b] <= budget:
+                if best is None or value[c] > value[best]:
+                    best = c
+        if best is not None:
+            pool.discard(best)
+            pool.add(s)
+            route[i] = best
+            return True
+    return False
+
+
+def solve(tt, value, candidates, budget, max_stops=MAX_STOPS):
+    """Route [0 (start), stops..., 1 (end)] over point indices; value[i] for the candidates."""
+    route, pool = [0, 1], set(candidates)
+    while True:
+        # grow greedily, then tighten the order and try to fit more / better stops
+        while len(route) - 2 < max_stops:
+            best = _best_insertion(tt, route, pool, value, budget, _cost(tt, route))
+            if best is None:
+                break
+            c, p, _ = best
+            route.insert(p, c)
+            pool.discard(c)
+        _or_opt(tt, _two_opt(tt, route))
+        if len(route) - 2 < max_stops and _best_insertion(tt, route, pool, value, budget, _cost(tt, route)):
+            continue
+        if not _swap(tt, route, pool, value, budget):
+            return route
+
+
+def plan_route(manifs, start=HOME, end=None, budget=BUDGET_MIN, depart=DEPART, max_stops=MAX_STOPS):
+    """Best route through the geocoded manifs (already restricted to one day) for the time budget."""
+    began = time.perf_counter()
+    end = end or start
+    # reachable: there and back in the budget at the assumed speed, keeping time for one visit
+    reach_km = (budget - VISIT_MIN) / 2 / 60 * SPEED_KMH / DETOUR
+    reachable = [m for _, m in SpatialIndex(manifs).within(start[0], start[1], reach_km)]
+    if len(reachable) > MAX_CANDIDATES:
+        reachable.sort(key=lambda m: value_of(m) / (1 + (m.dist_km or 0)), reverse=True)
+        reachable = reachable[:MAX_CANDIDATES]
+
+    points = [start, end] + [(m.lat, m.lon) for m in reachable]
+    tt = TravelTimes(points)
+    value = [0, 0] + [value_of(m) for m in reachable]
+    route = solve(tt, value, range(2, len(points)), budget, max_stops)
+
+    plan = Plan(start=start, end=end, candidates=len(reachable))
+    clock = datetime.combine(date.today(), datetime.strptime(depart, "%H:%M").time())
+    for a, b in zip(route, route[1:-1]):
+        clock += timedelta(minutes=tt.row(a)[b] + (VISIT_MIN if a > 1 else 0))
+        plan.stops.append(reachable[b - 2])
+        plan.arrivals.append(clock)
+    plan.travel_min = tt.route_minutes(route)
+    plan.total_min = _cost(tt, route)
+    plan.value = sum(value[i] for i in route)
+    plan.seconds = time.perf_counter() - began
+    return plan
+
+
+# =================================================================
+# /////////////////// CLI
+# =================================================================
+def _point(text):
+    lat, lon = (float(v) for v in text.split(","))
+    return lat, lon
+
+def _random_manifs(n, seed=1):
+    rng = random.Random(seed)
+    return [Manif(Titre=f"manif {i}", ManifLink=f"#{i}", Ville="Île-de-France", Exposants=rng.choice([-1, 30, 60, 120, 250, 400]),
+                  lat=rng.uniform(48.5, 49.2), lon=rng.uniform(1.8, 2.9)) for i in range(n)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Choose and order the manifs of a day for a time budget.")
+    parser.add_argument("files", nargs="*", help="geocoded JSON outputs or NDJSON streams")
+    parser.add_argument("--store", action="store_true", help="events of the event store, geocoded through the cache")
+    parser.add_argument("--date", help="day to plan (ISO or French label); default: first day to come")
+    parser.add_argument("--start", type=_point, default=HOME, help="lat,lon (default: HOME)")
+    parser.add_argument("--end", type=_point, help="lat,lon (default: back to start)")
+    parser.add_argument("--budget", type=float, default=BUDGET_MIN, help="minutes, travel and visits")
+    parser.add_argument("--depart", default=DEPART, help="HH:MM")
+    parser.add_argument("--stops", type=int, default=MAX_STOPS, help="at most this many stops")
+    parser.add_argument("--bench", type=int, metavar="N", help="plan over N random events instead")
+    args = parser.parse_args()
+
+    if args.bench:
+        plan = plan_route(_random_manifs(args.bench), args.start, args.end, args.budget, args.depart, args.stops)
+        print(plan.describe())
+        sys.exit(0)
+
+    if args.store:
+        from eventstore import EventStore
+        from geocode import geocode_manifs
+        with EventStore() as store:
+            manifs = store.query(day_from=date.today().isoformat())
+        print(geocode_manifs(manifs))
+    else:
+        manifs = [m for path in args.files for m in load_manifs(path)]
+    day = parse_date(args.date) if args.date else min((m.day for m in manifs if m.day and m.day >= date.today()), default=None)
+    if day is None:
+        sys.exit("No day to plan: pass --date or events to come.")
+    of_day = [m for m in manifs if m.day == day]
+    print(f"{format_date_fr(day)}: {len(of_day)} events, {sum(m.lat is not None for m in of_day)} geocoded")
+    print(plan_route(of_day, args.start, args.end, args.budget, args.depart, args.stops).describe())
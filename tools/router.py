@@ -4,12 +4,16 @@
 import fitz
 import os
 from PIL import Image
+from pdfrender import pixmap_to_pil, render_page
 import base64
 from datetime import datetime
 import webbrowser
 import json
 import glob
 import re
+import hashlib
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 
 #==========================CONFIG=============================================
 # PythonAnywhere compatible paths - use relative paths or /home/username structure
@@ -19,8 +23,18 @@ MIN_W = 300
 MIN_H = 300
 CROP_LEFT = 10   # 15 : percentage of the width to keep from the left
 CROP_RIGHT = 45  # 45 : percentage of the width to keep from the right
-IMG_TO_DISK = "off"  # "on" to write images to disk, "off" to use base64 in HTML
+PAGE_DPI = 150        # page renders
+PAGE_WIDTH_PX = None  # e.g. 720 / 1080: page renders this wide whatever the PDF size (phone screens) | None: PAGE_DPI
+MAX_DPI = 300         # upper bound when PAGE_WIDTH_PX asks for a narrow strip
+IMG_TO_DISK = "off"   # "on" to write images to disk, "off" to use base64 in HTML, "lazy": gallery images as files loaded when their route is opened (ship ASSETS_DIR with the HTML)
+ASSETS_DIR = "assets"  # "lazy": content-hashed images, next to the HTML (OUTPUT_BASE_DIR/assets)
 PREFIX = "VG_pany_"
+WORKERS = os.cpu_count() or 1  # PDFs rendered in parallel processes | 1: one after another
+DEDUPE = "off"        # "on": images repeated across the route PDFs (tiles, headers, flyers) kept once
+DEDUPE_HASH_SIZE = 16  # dHash grid: 16 -> 256 bits per image
+DEDUPE_MAX_BITS = 10   # differing hash bits for two images to be compared further (0: identical only)
+DEDUPE_THUMB_W = 32    # confirmation thumbnail width
+DEDUPE_MAX_DIFF = 24   # largest thumbnail pixel difference (0-255) still counted as the same image
 #=======================================================================
 
 # Color codes for console output
@@ -82,13 +96,115 @@ def page_is_blank_rule1(page):
         return False
     return True
 
+def blank_pages(doc):
+    """Numbers (1-based) of the blank pages, checked once for both extraction passes."""
+    return {page_number for page_number, page in enumerate(doc, start=1) if page_is_blank_rule1(page)}
+
 def image_to_base64(pil_img, format='PNG'):
     """Convert PIL image to base64 string"""
-    from io import BytesIO
     buffer = BytesIO()
     pil_img.save(buffer, format=format)
     return base64.b64encode(buffer.getvalue()).decode('utf-8')
 
+def image_to_asset(pil_img, format='PNG'):
+    """
+    Write the image as ASSETS_DIR/<content hash>.png next to the HTML; returns its relative URL.
+    Same image, same file: unchanged routes are neither rewritten nor re-downloaded (browser cache).
+    """
+    buffer = BytesIO()
+    pil_img.save(buffer, format=format)
+    data = buffer.getvalue()
+    name = f"{hashlib.sha1(data).hexdigest()[:16]}.{format.lower()}"
+    assets_dir = os.path.join(OUTPUT_BASE_DIR, ASSETS_DIR)
+    path = os.path.join(assets_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(assets_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"  # workers may write the same image at the same time
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return f"{ASSETS_DIR}/{name}"
+
+def gallery_image(pil_img, folder, name):
+    """Gallery entry for an image: a file URL ("lazy") or an inline data URL ("off")."""
+    if IMG_TO_DISK.lower() == "lazy":
+        src = image_to_asset(pil_img)
+    else:
+        src = f"data:image/png;base64,{image_to_base64(pil_img)}"
+    entry = {'folder': folder, 'name': name, 'src': src, 'width': pil_img.width, 'height': pil_img.height}
+    if DEDUPE.lower() == "on":
+        entry['fingerprint'] = image_fingerprint(pil_img)  # only dedupe_images reads it
+    return entry
+
+def image_fingerprint(pil_img, hash_size=DEDUPE_HASH_SIZE):
+    """
+    (dHash bits, thumbnail): brighter/darker signs between neighbours on a small grayscale
+    image, to find candidates fast, and a DEDUPE_THUMB_W wide RGB thumbnail to confirm them.
+    """
+    small = pil_img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+    bits = 0
+    for row in range(hash_size):
+        line = small[row * (hash_size + 1):(row + 1) * (hash_size + 1)]
+        for left, right in zip(line, line[1:]):
+            bits = (bits << 1) | (left > right)
+    thumb_h = max(1, round(DEDUPE_THUMB_W * pil_img.height / pil_img.width))
+    thumb = pil_img.convert("RGB").resize((DEDUPE_THUMB_W, thumb_h), Image.Resampling.BOX).tobytes()
+    return bits, thumb
+
+def same_image(a, b):
+    """Near-identical: hashes within DEDUPE_MAX_BITS and no thumbnail pixel off by more than DEDUPE_MAX_DIFF."""
+    (bits_a, thumb_a), (bits_b, thumb_b) = a['fingerprint'], b['fingerprint']
+    if (bits_a ^ bits_b).bit_count() > DEDUPE_MAX_BITS:
+        return False
+    # dHash alone merges pages of different small text (it averages to gray): the thumbnail does not
+    return max(abs(x - y) for x, y in zip(thumb_a, thumb_b)) <= DEDUPE_MAX_DIFF
+
+def dedupe_images(all_images_data):
+    """
+    Collapses identical and near-identical images (same size, same_image): a repeat in the
+    same folder is dropped, a repeat in another folder points at the first copy's src.
+    Returns the entries kept.
+    """
+    firsts = {}  # (width, height) -> first entries of that size
+    shown = set()  # (id of a first entry, folder) already in the gallery
+    timings = {}   # folder -> route timing carried by a dropped repeat
+    kept = []
+    for entry in all_images_data:
+        same = next((first for first in firsts.get((entry['width'], entry['height']), [])
+                     if same_image(first, entry)), None)
+        if same is None:
+            firsts.setdefault((entry['width'], entry['height']), []).append(entry)
+            shown.add((id(entry), entry['folder']))
+            kept.append(entry)
+        elif (id(same), entry['folder']) in shown:
+            if entry.get('route_timing_info'):
+                timings.setdefault(entry['folder'], entry['route_timing_info'])
+        else:
+            shown.add((id(same), entry['folder']))
+            kept.append({**entry, 'src': same['src']})
+    for entry in kept:  # a folder keeps its route timing even when the image carrying it was a repeat
+        if entry['folder'] in timings and not entry.get('route_timing_info'):
+            entry['route_timing_info'] = timings.pop(entry['folder'])
+    return kept
+
+def remove_unused_assets(before, after, output_html):
+    """
+    Asset files written by this run that no kept image uses anymore ("lazy"); output_html is
+    the gallery about to be rewritten. The assets folder is shared by every gallery of OUTPUT_BASE_DIR: a file still named
+    in another gallery's HTML is kept (content-hashed names can't collide with other text).
+    """
+    unused = {entry['src'] for entry in before} - {entry['src'] for entry in after}
+    unused = {src for src in unused if src.startswith(f"{ASSETS_DIR}/")}
+    for html_file in os.listdir(OUTPUT_BASE_DIR) if unused else ():
+        if html_file.lower().endswith('.html') and html_file != output_html:
+            with open(os.path.join(OUTPUT_BASE_DIR, html_file), 'r', encoding='utf-8', errors='replace') as f:
+                other = f.read()
+            unused = {src for src in unused if src not in other}
+    for src in unused:
+        path = os.path.join(OUTPUT_BASE_DIR, src)
+        if os.path.exists(path):
+            os.remove(path)
+
 def extract_route_timing_info(text):
     """
     Extract route timing information like '8:10 AM - 8:48 AM (38 min)' from text.
@@ -154,12 +270,12 @@ def get_footer_info():
 # ---------------------------------------------------
 # EXTRACT EMBEDDED IMAGES >= MIN_W x MIN_H
 # ---------------------------------------------------
-def extract_large_images(doc, embed_dir, pdf_name, all_images_data):
+def extract_large_images(doc, embed_dir, pdf_name, all_images_data, blank):
     index = 1
     first_image_skipped = False  # Flag to skip cropping for the first image
 
     for page_number, page in enumerate(doc, start=1):
-        if page_is_blank_rule1(page):
+        if page_number in blank:
             continue
 
         for img in page.get_images(full=True):
@@ -170,15 +286,7 @@ def extract_large_images(doc, embed_dir, pdf_name, all_images_data):
                 pix = None
                 continue
 
-            temp_file = f"temp_{pdf_name}.png"
-            if pix.n < 5:
-                pix.save(temp_file)
-            else:
-                rgb = fitz.Pixmap(fitz.csRGB, pix)
-                rgb.save(temp_file)
-                rgb = None
-
-            pil_img = Image.open(temp_file)
+            pil_img = pixmap_to_pil(pix)
 
             # Crop only if it's NOT the first image
             if first_image_skipped:
@@ -190,29 +298,21 @@ def extract_large_images(doc, embed_dir, pdf_name, all_images_data):
                 pil_img.save(os.path.join(embed_dir, f"page{page_number}_img{index}.png"))
                 print_color(f"  ✓ Saved embedded image: page{page_number}_img{index}.png", Colors.GREEN)
             else:
-                # Store in memory for HTML
-                base64_data = image_to_base64(pil_img)
-                all_images_data.append({
-                    'folder': pdf_name,
-                    'name': f"page{page_number}_img{index}.png",
-                    'base64': f"data:image/png;base64,{base64_data}"
-                })
+                # Store for HTML (inline or as a lazy-loaded file)
+                all_images_data.append(gallery_image(pil_img, pdf_name, f"page{page_number}_img{index}.png"))
                 print_color(f"  ✓ Processed embedded image: page{page_number}_img{index}.png", Colors.CYAN)
 
             pix = None
             index += 1
 
-    if os.path.exists(f"temp_{pdf_name}.png"):
-        os.remove(f"temp_{pdf_name}.png")
-
 # ---------------------------------------------------
 # EXPORT ALL NON-BLANK PAGES AS IMAGES + EDGE CROP
 # ---------------------------------------------------
-def export_pages_as_images(doc, page_dir, pdf_name, all_images_data):
+def export_pages_as_images(doc, page_dir, pdf_name, all_images_data, blank):
     route_timing_info = None
 
     for page_number, page in enumerate(doc, start=1):
-        if page_is_blank_rule1(page):
+        if page_number in blank:
             continue
 
         # Extract route timing info from first page
@@ -221,25 +321,17 @@ def export_pages_as_images(doc, page_dir, pdf_name, all_images_data):
             print_color(f"  📄 Extracting text from page 1 of {pdf_name}", Colors.BLUE)
             route_timing_info = extract_route_timing_info(text)
 
-        pix = page.get_pixmap(dpi=150)
-        temp_file = f"temp_page_{pdf_name}.png"
-        pix.save(temp_file)
+        # already cropped: only the kept strip is rasterized
+        pix = render_page(page, CROP_LEFT, CROP_RIGHT, PAGE_DPI, PAGE_WIDTH_PX, MAX_DPI)
+        pil_img = pixmap_to_pil(pix)
         pix = None
 
-        pil_img = Image.open(temp_file)
-        pil_img = crop_edges(pil_img)
-
         if IMG_TO_DISK.lower() == "on":
             pil_img.save(os.path.join(page_dir, f"page_{page_number}.png"))
             print_color(f"  ✓ Saved page image: page_{page_number}.png", Colors.GREEN)
         else:
-            # Store in memory for HTML
-            base64_data = image_to_base64(pil_img)
-            image_data = {
-                'folder': pdf_name,
-                'name': f"page_{page_number}.png",
-                'base64': f"data:image/png;base64,{base64_data}"
-            }
+            # Store for HTML (inline or as a lazy-loaded file)
+            image_data = gallery_image(pil_img, pdf_name, f"page_{page_number}.png")
             # Add route timing info only to the first image
             if page_number == 1 and route_timing_info:
                 image_data['route_timing_info'] = route_timing_info
@@ -247,9 +339,6 @@ def export_pages_as_images(doc, page_dir, pdf_name, all_images_data):
             all_images_data.append(image_data)
             print_color(f"  ✓ Processed page image: page_{page_number}.png", Colors.CYAN)
 
-    if os.path.exists(f"temp_page_{pdf_name}.png"):
-        os.remove(f"temp_page_{pdf_name}.png")
-
 # ---------------------------------------------------
 # PROCESS SINGLE PDF
 # ---------------------------------------------------
@@ -262,8 +351,9 @@ def process_pdf(pdf_path, all_images_data):
         embed_dir, page_dir = ensure_dirs(pdf_name)
         doc = fitz.open(pdf_path)
 
-        extract_large_images(doc, embed_dir, pdf_name, all_images_data)
-        export_pages_as_images(doc, page_dir, pdf_name, all_images_data)
+        blank = blank_pages(doc)
+        extract_large_images(doc, embed_dir, pdf_name, all_images_data, blank)
+        export_pages_as_images(doc, page_dir, pdf_name, all_images_data, blank)
 
         doc.close()
         print_color(f"✅ Completed: {pdf_name}", Colors.GREEN + Colors.BOLD)
@@ -272,6 +362,14 @@ def process_pdf(pdf_path, all_images_data):
         print_color(f"❌ Error processing {pdf_path}: {str(e)}", Colors.RED)
         return False
 
+def render_pdf(pdf_path):
+    """
+    Pool worker: one PDF in its own process (own fitz document) -> (success, gallery entries).
+    With IMG_TO_DISK "lazy" the entries are only file paths and sizes, cheap to send back.
+    """
+    images_data = []
+    return process_pdf(pdf_path, images_data), images_data
+
 # ---------------------------------------------------
 # HTML GALLERY CREATION
 # ---------------------------------------------------
@@ -282,15 +380,21 @@ def create_html_gallery(all_images_data, output_file):
     # Group images by folder
     folders_data = []
     folders_dict = {}
+    sources, source_index = [], {}
 
     for img_data in all_images_data:
         folder_name = img_data['folder']
         if folder_name not in folders_dict:
             folders_dict[folder_name] = []
 
+        if img_data['src'] not in source_index:
+            source_index[img_data['src']] = len(sources)
+            sources.append(img_data['src'])
         folders_dict[folder_name].append({
             'name': img_data['name'],
-            'base64': img_data['base64'],
+            'src': source_index[img_data['src']],  # index in sources: a shared image is in the page once
+            'width': img_data['width'],
+            'height': img_data['height'],
             'route_timing_info': img_data.get('route_timing_info')
         })
 
@@ -315,7 +419,7 @@ def create_html_gallery(all_images_data, output_file):
         return None
 
     # Create HTML content
-    html_content = create_html_content(folders_data, INPUT_DIR)
+    html_content = create_html_content(folders_data, INPUT_DIR, sources)
 
     # Save HTML file
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -329,9 +433,10 @@ def create_html_gallery(all_images_data, output_file):
 
     return output_file
 
-def create_html_content(folders_data, master_dir):
+def create_html_content(folders_data, master_dir, sources):
     """Create the HTML content for the gallery"""
     folders_json = json.dumps(folders_data)
+    sources_json = json.dumps(sources)
     footer_info = get_footer_info()
 
     # Dhuhr prayer times data
@@ -786,6 +891,7 @@ def create_html_content(folders_data, master_dir):
     <script>
         // Folder data injected by Python script
         const folders = {folders_json};
+        const sources = {sources_json};  // image URLs, each once; folder images refer to them by index
         const masterDir = "{master_dir}";
 
         // Dhuhr prayer times data
@@ -986,7 +1092,7 @@ def create_html_content(folders_data, master_dir):
                     imagesHTML += `
                         <div class="image-card" ondblclick="toggleImageZoom(this)">
                             <div class="image-container">
-                                <img src="${{image.base64}}" alt="${{image.name}}">
+                                <img data-src="${{sources[image.src]}}" alt="${{image.name}}" width="${{image.width}}" height="${{image.height}}" decoding="async">
                             </div>
                         </div>
                     `;
@@ -1027,6 +1133,14 @@ def create_html_content(folders_data, master_dir):
             setTimeout(updateRedLines, 100);
         }}
 
+        // Images are only fetched when their folder is first opened (data-src -> src)
+        function loadFolderImages(folderContent) {{
+            folderContent.querySelectorAll('img[data-src]').forEach(img => {{
+                img.src = img.dataset.src;
+                img.removeAttribute('data-src');
+            }});
+        }}
+
         // Toggle folder accordion - closes all others when opening one
         function toggleFolder(index) {{
             const folderContent = document.getElementById(`folder-${{index}}`);
@@ -1039,6 +1153,7 @@ def create_html_content(folders_data, master_dir):
 
             // Open clicked folder only if it wasn't active
             if (!isActive) {{
+                loadFolderImages(folderContent);
                 folderContent.classList.add('active');
             }}
 
@@ -1089,8 +1204,8 @@ def main():
         os.makedirs(OUTPUT_BASE_DIR, exist_ok=True)
 
     # Get all PDF files in the input directory
-    pdf_files = [f for f in os.listdir(INPUT_DIR)
-                if f.lower().endswith('.pdf') and os.path.isfile(os.path.join(INPUT_DIR, f))]
+    pdf_files = sorted(f for f in os.listdir(INPUT_DIR)
+                       if f.lower().endswith('.pdf') and os.path.isfile(os.path.join(INPUT_DIR, f)))
 
     if not pdf_files:
         print_color(f"❌ No PDF files found in {INPUT_DIR}", Colors.RED)
@@ -1104,9 +1219,19 @@ def main():
     successful = 0
     failed = 0
 
-    for pdf_file in pdf_files:
-        pdf_path = os.path.join(INPUT_DIR, pdf_file)
-        if process_pdf(pdf_path, all_images_data):
+    # one process per PDF when WORKERS > 1; map() keeps the results (and gallery folders) in file order
+    pdf_paths = [os.path.join(INPUT_DIR, pdf_file) for pdf_file in pdf_files]
+    workers = min(WORKERS, len(pdf_paths))
+    if workers > 1:
+        print_color(f"⚙ Rendering with {workers} processes", Colors.BLUE)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_pdf, pdf_paths))
+    else:
+        results = map(render_pdf, pdf_paths)
+
+    for ok, images_data in results:
+        all_images_data.extend(images_data)
+        if ok:
             successful += 1
         else:
             failed += 1
@@ -1116,6 +1241,14 @@ def main():
     print_color(f"✅ Successfully processed: {successful} files", Colors.GREEN)
     print_color(f"❌ Failed: {failed} files", Colors.RED if failed > 0 else Colors.GREEN)
 
+    if DEDUPE.lower() == "on" and all_images_data:
+        deduped = dedupe_images(all_images_data)
+        shared = len(deduped) - len({entry['src'] for entry in deduped})
+        print_color(f"🧹 Dedupe: {len(all_images_data)} images -> {len(deduped)} shown, "
+                    f"{len(all_images_data) - len(deduped)} repeats dropped, {shared} shared across folders", Colors.CYAN)
+        remove_unused_assets(all_images_data, deduped, OUTPUT_HTML)
+        all_images_data = deduped
+
     # Create HTML gallery
     if all_images_data:
         output_path = os.path.join(OUTPUT_BASE_DIR, OUTPUT_HTML)
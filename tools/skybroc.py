@@ -1,34 +1,50 @@
-import locale
 import json
 import re
 import time
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from datetime import datetime, date, timedelta
+from typing import List, Optional
 from urllib.parse import urljoin
+import asyncio
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
+from httpcache import CachedSession, cached_get_async
+from ratelimit import HostLimiter
+from htmlparse import make_soup, keep
+from jsonpublish import JsonPublisher
+from eventstore import EventStore
+from manif import Manif, group_by_day
+from frdates import parse_date, format_date_fr
+from eventstream import EventStream, run_key
+from contextlib import nullcontext
+from geocode import geocode_manifs
+from spatial import set_home_distance
+from discovery import discover_sync, shard_listing_url, find_next_page
 
 #_____________CONFIG_____________________
 #MASTER_URL = "https://brocabrac.fr/ile-de-france/vide-grenier/?d=2025-11-22,2025-12-28"
 MASTER_URL = os.environ.get("MASTER_URL")
-JSON_HOSTING_URL = "https://jsonhosting.com/api/json/2ea29f9a"
+JSONHOSTING_BASE = os.environ.get("JSONHOSTING_BASE", "https://jsonhosting.com/api/json")  # tools/fakejsonhosting.py for local runs
+JSON_HOSTING_URL = f"{JSONHOSTING_BASE}/2ea29f9a"
+EVENT_SOURCE = "brocabrac"  # key of these events in the event store (.cache/events.sqlite)
+PUBLISH_MODE = os.environ.get("PUBLISH_MODE", "full")  # "full": one PATCH of everything | "sharded": compact monthly shards, changed ones only (tools/jsonpublish.py)
 EDIT_KEY = "7d4982b93df21c740681018af810d5faeda577b5031d33dbb39825ca596635db"  # os.environ.get("JSONHOSTING_EDIT_KEY") 
+DEPARTEMENTS = [d.strip() for d in os.environ.get("DEPARTEMENTS", "").split(",") if d.strip()]  # path slugs replacing "ile-de-france"
+ASYNC_MODE = os.environ.get("SKYBROC_ASYNC", "on")          # "on": pooled aiohttp client, "off": one page at a time
+CONCURRENCY = int(os.environ.get("SKYBROC_CONCURRENCY", "8"))  # ceiling of event pages in flight (AIMD adapts below it)
+RATE = float(os.environ.get("SKYBROC_RATE", "5"))             # starting requests per second per host (token bucket)
+STREAM_PATH = os.environ.get("STREAM_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             ".cache", "skybroc_events.ndjson"))  # one JSON line per event as soon as scraped ("" : off)
+RESUME = os.environ.get("RESUME", "on") == "on"  # an interrupted run of the same window restarts from STREAM_PATH
+GEOCODE = os.environ.get("GEOCODE", "on") == "on"  # lat/lon published with the events (tools/geocode.py)
+UNDATED_LABEL = "NA/Unparsed Date (01.01.0001)"  # group of the events without a date in the feed (viewers key on it)
 #________________________________________
 
+EVENT_HREF_RE = re.compile(r'/\d{1,}/\w+/[0-9]+\-')
 REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-DEFAULT_DATE = datetime(1, 1, 1)
-FRENCH_MONTHS = {
-    'janvier': 'January', 'février': 'February', 'mars': 'March', 'avril': 'April', 'mai': 'May', 
-    'juin': 'June', 'juillet': 'July', 'août': 'August',
-    'septembre': 'September', 'octobre': 'October', 'novembre': 'November', 'décembre': 'December'
-}
-FRENCH_WEEKDAYS = {
-    'lundi': '', 'mardi': '', 'mercredi': '', 'jeudi': '', 
-    'vendredi': '', 'samedi': '', 'dimanche': ''
-}
+LIMITER = HostLimiter(rate=RATE, burst=CONCURRENCY, max_concurrency=CONCURRENCY)  # paces sync and async paths alike
+SESSION = CachedSession(headers=REQUEST_HEADERS, limiter=LIMITER)  # on-disk cache shared with the other scrapers
 
 #------------- 0. JSON Hosting Update Function ---
 def update_jsonhosting(json_url: str, edit_key: str, data: dict, retries: int = 2, delay: int = 5):
@@ -62,66 +78,26 @@ def update_jsonhosting(json_url: str, edit_key: str, data: dict, retries: int =
                 print("❌ All attempts failed.")
                 return False
 
-#---------- 1. Data Structure (Manif Object) ---
-@dataclass
-class Manif:
-    """The required object structure for each event."""
-    Titre: str = "NA"
-    Exposants: int = -1
-    Ville: str = "NA"
-    Adresse: str = "NA"
-    ManifDate: datetime = DEFAULT_DATE  # Used internally for sorting/grouping
-    ManifLink: str = "NA"
+#---------- 1. Data Structure: Manif (tools/manif.py), shared with scra / skyscra ---
+# manif.day (a date, None if unparsed) drives sorting and grouping; ManifDate is the label set at output time
 
 # --- 2. Utility Methods for Extraction and Formatting ---
-def normalize_french_date(date_str: str) -> str:
-    """Replaces French month and weekday names with English equivalents for parsing."""
-    normalized_str = date_str.lower()
-    for fr, en in FRENCH_MONTHS.items():
-        normalized_str = normalized_str.replace(fr, en)
-    for fr in FRENCH_WEEKDAYS.keys():
-        normalized_str = normalized_str.replace(fr, '')
-    
-    normalized_str = re.sub(r'\s+', ' ', normalized_str).strip()
-    return normalized_str
-
-def parse_french_date(date_str: str) -> datetime:
-    """Converts a French date string to a datetime object robustly."""
-    if not date_str: return DEFAULT_DATE
-    
-    normalized_str = normalize_french_date(date_str)    
-    formats = ['%d %B %Y', '%d %b %Y']
-    
-    for fmt in formats:
-        try: 
-            return datetime.strptime(normalized_str, fmt)
-        except ValueError: 
-            continue
-    
-    try:
-        match = re.search(r'(\d{1,2}\s+(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4})', normalized_str, re.IGNORECASE)
-        if match:
-             return datetime.strptime(match.group(1).strip(), '%d %B %Y')
-    except Exception:
-        pass
-        
-    return DEFAULT_DATE
-
-def extract_manif_date(event_soup: BeautifulSoup) -> datetime:
-    """Extracts and parses the ManifDate (datetime) property."""
+# date strings are parsed by tools/frdates.py (lookup tables, memoized)
+def extract_manif_date(event_soup: BeautifulSoup) -> Optional[date]:
+    """Extracts and parses the event day (None when not found)."""
     try:
         date_element = event_soup.find('time') or event_soup.find(class_='manif-date')
         if date_element:
-            return parse_french_date(date_element.text.strip())
+            return parse_date(date_element.text.strip())
         
         body_text = event_soup.get_text()
         date_match = re.search(r'(lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)\s+\d{1,2}\s+(janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre)\s+\d{4}', body_text, re.IGNORECASE)
         if date_match:
-            return parse_french_date(date_match.group(0))
+            return parse_date(date_match.group(0))
 
-        return DEFAULT_DATE
+        return None
     except Exception:
-        return DEFAULT_DATE
+        return None
 
 def extract_titre(event_soup: BeautifulSoup) -> str:   
     try:
@@ -191,109 +167,115 @@ def extract_ville_and_arrondissement(full_address: str) -> str:
 
 
 # --- 3. Main Scraping Logic Functions ---
-def scrape_master_page(url: str) -> List[Manif]:
-    print(f"Step 1: Fetching links from master page: {url}")
-    manif_links: List[Manif] = []
-    
-    try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=15)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Error fetching Master URL: {e}")
-        return []
+def fetch_listing_page(url: str) -> bytes:
+    response = SESSION.get(url, timeout=15)
+    response.raise_for_status()
+    return response.content
+
+def parse_listing_page(content, page_url: str):
+    """Event links of one results page (-> card text) and the URL of the next page."""
+    soup = make_soup(content, keep(('a', 'link')))  # only the links: results and pagination
+    base_url = '/'.join(page_url.split('/')[:3])
+    cards = {}
+    for link_element in soup.find_all('a', href=EVENT_HREF_RE):
+        full_url = urljoin(base_url, link_element['href'])
+        cards.setdefault(full_url, link_element.get_text(" ", strip=True))
+    return cards, find_next_page(soup, page_url)
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    event_links: list = soup.find_all('a', href=re.compile(r'/\d{1,}/\w+/[0-9]+\-'))
+def scrape_master_page(url: str) -> List[Manif]:
+    """Weekly shards of the master search (x DEPARTEMENTS), every results page, links deduplicated."""
+    shard_urls = shard_listing_url(url, regions=DEPARTEMENTS, region_segment=0, range_key='d')
+    print(f"Step 1: Fetching links from {len(shard_urls)} listing shards of: {url}")
+    cards, _ = discover_sync(shard_urls, fetch_listing_page, parse_listing_page)  # no manifest to prune here
 
-    if not event_links:
+    if not cards:
         print("Error: Could not find any event links on the master page. Check the regex or selectors.")
         return []
 
-    base_url_parts = url.split('/')
-    base_url = '/'.join(base_url_parts[:3])
+    return [Manif(ManifLink=full_url) for full_url in cards]
 
-    for link_element in event_links:
-        relative_url = link_element['href']
-        full_url = urljoin(base_url, relative_url)
-        manif_links.append(Manif(ManifLink=full_url))
+def fill_manif(manif: Manif, content) -> Manif:
+    soup = make_soup(content)
 
-    return manif_links
+    manif.Adresse = extract_adresse(soup)
+    manif.Ville = extract_ville_and_arrondissement(manif.Adresse)
+    manif.Titre = extract_titre(soup)
+    manif.Exposants = extract_exposants(soup)
+    manif.day = extract_manif_date(soup)
+    manif.ManifDate = format_date_fr(manif.day)  # 'Samedi 15 Novembre 2025', FALLBACK_DATE when unknown
+    return manif
 
-def scrape_event_details(manif: Manif) -> Manif:
+def scrape_event_details(manif: Manif, on_record=None) -> Manif:
     url = manif.ManifLink
     print(f"  > Fetching details for: {url}")
     
     try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=15)
+        response = SESSION.get(url, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        manif.Adresse = extract_adresse(soup)
-        manif.Ville = extract_ville_and_arrondissement(manif.Adresse)
-        manif.Titre = extract_titre(soup)
-        manif.Exposants = extract_exposants(soup)
-        manif.ManifDate = extract_manif_date(soup) 
-        
+        fill_manif(manif, response.content)
     except requests.RequestException as e:
         print(f"  > Error fetching event URL {url}: {e}. Defaults used.")
-        
-    time.sleep(0.5) 
-    
+        return manif
+    except Exception as e:  # one odd page must not stop the run
+        print(f"  > Error extracting event {url}: {e!r}. Defaults used.")
+        return manif
+
+    # only filled events reach the stream: it is also the resume checkpoint, failed ones are retried
+    if on_record:
+        on_record(manif)
     return manif
 
-def process_and_output(manifs: List[Manif]):
-    """Groups, sorts, prints to screen, and UPDATES the online JSON file."""
-    
-    manifs_by_date: Dict[datetime, List[Manif]] = defaultdict(list)
-    for manif in manifs:
-        manifs_by_date[manif.ManifDate].append(manif)
+async def scrape_event_details_async(session, manif: Manif, on_record=None) -> Manif:
+    url = manif.ManifLink
+    print(f"  > Fetching details for: {url}")
+    try:
+        # fresh cache hits are answered before the limiter: only real requests take a token / slot
+        content = await cached_get_async(session, url, SESSION.cache, stats=SESSION, limiter=LIMITER,
+                                         retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError))
+        fill_manif(manif, content)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"  > Error fetching event URL {url}: {e}. Defaults used.")
+        return manif
+    except Exception as e:  # an extraction error stays with its event, gather() goes on
+        print(f"  > Error extracting event {url}: {e!r}. Defaults used.")
+        return manif
+    if on_record:
+        on_record(manif)  # streamed as soon as filled, not when the whole batch is done
+    return manif
 
-    sorted_dates = sorted([d for d in manifs_by_date if d != DEFAULT_DATE])
-    if DEFAULT_DATE in manifs_by_date:
-        sorted_dates.append(DEFAULT_DATE)
+async def scrape_all_event_details(manifs: List[Manif], concurrency: int = CONCURRENCY, on_record=None) -> List[Manif]:
+    """Keep-alive connection pool; LIMITER decides how many pages are in flight per host. Keeps input order."""
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=15)
+    async with aiohttp.ClientSession(headers=REQUEST_HEADERS, connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*(scrape_event_details_async(session, m, on_record) for m in manifs))
 
-    json_output_data: Dict[str, Any] = {}
-    
-    # Set locale for output date formatting (French)
-    current_locale = locale.getlocale(locale.LC_TIME)
-    try:
-        locale.setlocale(locale.LC_TIME, 'fr_FR.UTF-8')
-    except:
-         try: locale.setlocale(locale.LC_TIME, 'fr_FR')
-         except: pass
-
-    for date in sorted_dates:
-        manifs_list = manifs_by_date[date]
-        manifs_list.sort(key=lambda m: m.Exposants, reverse=True)
-        
-        date_str_formatted = "NA/Unparsed Date (01.01.0001)"
-        if date != DEFAULT_DATE:
-            date_str_formatted = date.strftime('%A %d %B %Y')
-        
-        json_group: List[Dict[str, Any]] = []
-        
-        for manif in manifs_list:
-            manif_dict = {
-                "Titre": manif.Titre,
-                "Exposants": manif.Exposants,
-                "Adresse": manif.Adresse, 
-                "Ville": manif.Ville,
-                "ManifDate": date_str_formatted, 
-                "ManifLink": manif.ManifLink
-            }
-            json_group.append(manif_dict)
-        
-        json_output_data[date_str_formatted] = json_group
+def process_and_output(manifs: List[Manif]):
+    """Groups, sorts, prints to screen, and UPDATES the online JSON file."""
+    # ManifDate labels come from fill_manif (format_date_fr: no process locale, same text as scra),
+    # so this can run from worker threads / asyncio tasks; grouping sorts on manif.day
+    # the event store is the system of record; the feed is the view of what this run listed
+    seen_at = datetime.now()
+    with EventStore() as store:
+        store.upsert(EVENT_SOURCE, manifs, seen_at=seen_at)
+        listed = store.query(source=EVENT_SOURCE, seen_since=seen_at)
+    if GEOCODE:
+        print(geocode_manifs(listed))
+        print(set_home_distance(listed))
+    for manif in listed:
+        if manif.day is None:
+            manif.ManifDate = UNDATED_LABEL
+    grouped = group_by_day(listed)
 
-    # Restore original locale
-    try: locale.setlocale(locale.LC_TIME, current_locale)
-    except: pass
-    
     metadata = {"last_update": datetime.now().strftime('%d.%m.%Y %H:%M:%S')}
-    final_data = {"metadata": metadata, "events": json_output_data}
     
-    # Use the provided function to update the remote JSON file
-    update_jsonhosting(JSON_HOSTING_URL, EDIT_KEY, final_data)
+    if PUBLISH_MODE == "sharded":
+        JsonPublisher(JSON_HOSTING_URL, EDIT_KEY, "skybroc", create_url=JSONHOSTING_BASE).publish(grouped, metadata)
+    else:
+        json_output_data = {d: [m.to_dict() for m in ms] for d, ms in grouped.items()}
+        final_data = {"metadata": metadata, "events": json_output_data}
+        # Use the provided function to update the remote JSON file
+        update_jsonhosting(JSON_HOSTING_URL, EDIT_KEY, final_data)
 
 #=======================================================
 #__________________RUN_________________________________
@@ -310,6 +292,19 @@ if __name__ == "__main__":
     if not manifs_with_links:
         print("\n[ERROR]-Scraping aborted: No event links were found on the master page.")
     else:
-        print(f"\nStep 2: Scraping details for {len(manifs_with_links)} events...")
-        completed_manifs = [scrape_event_details(manif) for manif in manifs_with_links]
-        process_and_output(completed_manifs)
\ No newline at end of file
+        # the stream doubles as checkpoint: events of an interrupted run of this window are not fetched again
+        with (EventStream(STREAM_PATH, key=run_key(MASTER_URL, DEPARTEMENTS), resume=RESUME)
+              if STREAM_PATH else nullcontext()) as stream:
+            done = stream.done if stream else {}
+            todo = [manif for manif in manifs_with_links if manif.ManifLink not in done]
+            print(f"\nStep 2: Scraping details for {len(todo)} events ({len(manifs_with_links) - len(todo)} resumed)...")
+            on_record = stream and stream.write
+            if ASYNC_MODE == "on":
+                asyncio.run(scrape_all_event_details(todo, on_record=on_record))
+            else:
+                for manif in todo:
+                    scrape_event_details(manif, on_record)
+        completed_manifs = [done.get(manif.ManifLink, manif) for manif in manifs_with_links]
+        process_and_output(completed_manifs)
+    print(SESSION.summary())
+    SESSION.close()
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+        //////////////////  SPATIAL INDEX /////////////////////////////
+        "Which manifs are near home?" answered in Python, in memory, on the
+        lat / lon added by tools/geocode.py: events are bucketed in a grid of
+        CELL_KM cells, so a query only looks at the cells it overlaps instead
+        of every event, and never geocodes anything.
+
+        index = SpatialIndex(manifs)
+        index.within(48.8566, 2.3522, 20)          # [(km, Manif)] closest first
+        index.nearest(48.8566, 2.3522, k=10)
+        index.in_bbox(48.7, 2.1, 49.0, 2.6)        # south, west, north, east
+
+        python tools/spatial.py OUTPUT_DIR/vg_manifs.json --km 20
+        python tools/spatial.py --bench 20000
+
+Events without coordinates are left out of the index. set_home_distance() fills
+Manif.dist_km (published with the events) from HOME.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from manif import Manif
+
+# =================================================================
+# /////////////////// CONFIGURATION
+# =================================================================
+# lat,lon of home (5 rue Victor Considérant, Paris 14): dist_km and the home marker of scra.py's page
+HOME = tuple(float(v) for v in os.environ.get("VG_HOME", "48.8256,2.3259").split(","))
+CELL_KM = 5.0           # grid cell side: about the radius of the smallest useful query
+EARTH_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# =================================================================
+# /////////////////// INDEX
+# =================================================================
+class SpatialIndex:
+    """Grid buckets {(row, col): [Manif]} over the geocoded events."""
+
+    def __init__(self, manifs, cell_km=CELL_KM):
+        self.points = [m for m in manifs if m.lat is not None and m.lon is not None]
+        self.dlat = cell_km / KM_PER_DEG_LAT
+        # cells are cell_km wide at the event closest to the equator, a bit narrower away from it
+        closest = min((abs(m.lat) for m in self.points), default=0.0)
+        self.dlon = cell_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(closest)), 0.01))
+        self.cells = {}
+        for m in self.points:
+            self.cells.setdefault(self._cell(m.lat, m.lon), []).append(m)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.dlat), math.floor(lon / self.dlon)
+
+    def _candidates(self, south, west, north, east):
+        (r0, c0), (r1, c1) = self._cell(south, west), self._cell(north, east)
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self.cells):  # box larger than the data: walk the buckets instead
+            for (r, c), bucket in self.cells.items():
+                if r0 <= r <= r1 and c0 <= c <= c1:
+                    yield from bucket
+            return
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                yield from self.cells.get((r, c), ())
+
+    def in_bbox(self, south, west, north, east):
+        """Events inside the box, in no particular order."""
+        return [m for m in self._candidates(south, west, north, east)
+                if south <= m.lat <= north and west <= m.lon <= east]
+
+    def within(self, lat, lon, km):
+        """[(distance km, Manif)] within km of (lat, lon), closest first."""
+        dlat = km / KM_PER_DEG_LAT
+        # the circle is widest (in degrees of longitude) at its latitude farthest from the equator
+        far = min(abs(lat) + dlat, 89.9)
+        dlon = km / (KM_PER_DEG_LAT * math.cos(math.radians(far)))
+        found = []
+        for m in self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            d = haversine_km(lat, lon, m.lat, m.lon)
+            if d <= km:
+                found.append((d, m))
+        found.sort(key=lambda x: x[0])
+        return found
+
+    def nearest(self, lat, lon, k=10):
+        """The k events closest to (lat, lon) as [(distance km, Manif)]: radius doubled until k are inside."""
+        if not self.points:
+            return []
+        km = self.dlat * KM_PER_DEG_LAT
+        while True:
+            found = self.within(lat, lon, km)
+            if len(found) >= k or len(found) == len(self.points):
+                return found[:k]
+            km *= 2
+
+
+def set_home_distance(manifs, home=HOME):
+    """Fills Manif.dist_km (km from home, as the crow flies, 0.1 km precision); returns a one-line summary."""
+    located = 0
+    for m in manifs:
+        if m.lat is None or m.lon is None:
+            m.dist_km = None
+            continue
+        m.dist_km = round(haversine_km(home[0], home[1], m.lat, m.lon), 1)
+        located += 1
+    return f"[spatial] distance from home {home[0]:.4f},{home[1]:.4f} set on {located}/{len(manifs)} events"
+
+
+# =================================================================
+# /////////////////// CLI
+# =================================================================
+def load_manifs(path):
+    """Events of a JSON output ({date: [..]} / {"events": {..}}) or of an NDJSON stream."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".ndjson"):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
+            grouped = data.get("events", data) if isinstance(data, dict) else {}
+            records = [e for group in grouped.values() if isinstance(group, list) for e in group]
+    return [Manif.from_dict(r) for r in records if "ManifLink" in r]
+
+def _random_manifs(n, seed=1):
+    """n events scattered over Île-de-France and its neighbours."""
+    rng = random.Random(seed)
+    return [Manif(Titre=f"manif {i}", ManifLink=f"#{i}", Exposants=rng.randint(20, 400),
+                  lat=rng.uniform(48.0, 49.6), lon=rng.uniform(1.2, 3.6)) for i in range(n)]
+
+def _bench(manifs, home, km, k):
+    start = time.perf_counter()
+    index = SpatialIndex(manifs)
+    built = time.perf_counter()
+    hits = index.within(home[0], home[1], km)
+    queried = time.perf_counter()
+    top = index.nearest(home[0], home[1], k)
+    nearest = time.perf_counter()
+    scan = sorted((haversine_km(home[0], home[1], m.lat, m.lon), m.ManifLink) for m in index.points)
+    scanned = time.perf_counter()
+    assert [link for d, link in scan if d <= km] == [m.ManifLink for _, m in hits], "index and full scan disagree"
+    assert [link for _, link in scan[:k]] == [m.ManifLink for _, m in top], "nearest and full scan disagree"
+    print(f"{len(index)} events, {len(index.cells)} cells of {CELL_KM} km")
+    print(f"  build {1000 * (built - start):8.2f} ms")
+    print(f"  within {km:g} km {1000 * (queried - built):8.2f} ms   {len(hits)} events")
+    print(f"  nearest {k} {1000 * (nearest - queried):8.2f} ms")
+    print(f"  full scan {1000 * (scanned - nearest):8.2f} ms   (what the index avoids)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Events near a point, from geocoded JSON / NDJSON outputs.")
+    parser.add_argument("files", nargs="*", help="JSON outputs or NDJSON streams with lat/lon")
+    parser.add_argument("--near", default=",".join(map(str, HOME)), help="lat,lon (default: HOME)")
+    parser.add_argument("--km", type=float, default=20, help="radius")
+    parser.add_argument("--top", type=int, help="k nearest instead of a radius")
+    parser.add_argument("--bench", type=int, metavar="N", help="time the index on N random events (or on the files)")
+    args = parser.parse_args()
+
+    near = tuple(float(v) for v in args.near.split(","))
+    manifs = [m for path in args.files for m in load_manifs(path)]
+    if args.bench or not args.files:
+        _bench(manifs or _random_manifs(args.bench or 20000), near, args.km, args.top or 10)
+        sys.exit(0)
+    index = SpatialIndex(manifs)
+    print(f"{len(index)}/{len(manifs)} events geocoded")
+    hits = index.nearest(near[0], near[1], args.top) if args.top else index.within(near[0], near[1], args.km)
+    for d, m in hits:
+        print(f"{d:6.1f} km | {m.ManifDate} | {m.Exposants:>4} | {m.Ville} | {m.Titre} | {m.ManifLink}")
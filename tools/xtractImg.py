@@ -2,7 +2,7 @@
 
 import fitz
 import os
-from PIL import Image
+from pdfrender import pixmap_to_pil, render_page
 
 #==========================CONFIG=============================================
 INPUT_DIR = r"C:\Users\hdoghmen\Downloads\down01\CC"  # Directory containing PDF files
@@ -11,6 +11,9 @@ MIN_W = 300
 MIN_H = 300
 CROP_LEFT = 15   # percentage of the width to keep from the left
 CROP_RIGHT = 45  # percentage of the width to keep from the right
+PAGE_DPI = 150        # page renders
+PAGE_WIDTH_PX = None  # e.g. 720 / 1080: page renders this wide whatever the PDF size (phone screens) | None: PAGE_DPI
+MAX_DPI = 300         # upper bound when PAGE_WIDTH_PX asks for a narrow strip
 #=======================================================================
 
 # ---------------------------------------------------
@@ -74,15 +77,7 @@ def extract_large_images(doc, embed_dir, pdf_name):
                 pix = None
                 continue
 
-            temp_file = f"temp_{pdf_name}.png"
-            if pix.n < 5:
-                pix.save(temp_file)
-            else:
-                rgb = fitz.Pixmap(fitz.csRGB, pix)
-                rgb.save(temp_file)
-                rgb = None
-
-            pil_img = Image.open(temp_file)
+            pil_img = pixmap_to_pil(pix)
 
             # Crop only if it's NOT the first image
             if first_image_skipped:
@@ -95,9 +90,6 @@ def extract_large_images(doc, embed_dir, pdf_name):
             pix = None
             index += 1
 
-    if os.path.exists(f"temp_{pdf_name}.png"):
-        os.remove(f"temp_{pdf_name}.png")
-
 # ---------------------------------------------------
 # EXPORT ALL NON-BLANK PAGES AS IMAGES + EDGE CROP
 # ---------------------------------------------------
@@ -106,18 +98,12 @@ def export_pages_as_images(doc, page_dir, pdf_name):
         if page_is_blank_rule1(page):
             continue
 
-        pix = page.get_pixmap(dpi=150)
-        temp_file = f"temp_page_{pdf_name}.png"
-        pix.save(temp_file)
+        # already cropped: only the kept strip is rasterized
+        pix = render_page(page, CROP_LEFT, CROP_RIGHT, PAGE_DPI, PAGE_WIDTH_PX, MAX_DPI)
+        pil_img = pixmap_to_pil(pix)
         pix = None
-
-        pil_img = Image.open(temp_file)
-        pil_img = crop_edges(pil_img)
         pil_img.save(os.path.join(page_dir, f"page_{page_number}.png"))
 
-    if os.path.exists(f"temp_page_{pdf_name}.png"):
-        os.remove(f"temp_page_{pdf_name}.png")
-
 # ---------------------------------------------------
 # PROCESS SINGLE PDF
 # ---------------------------------------------------